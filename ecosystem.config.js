@@ -7,11 +7,14 @@ module.exports = {
       exec_mode: 'cluster',
       env: {
         NODE_ENV: 'development',
-        PORT: 8000
+        PORT: 8000,
+        // One worker per core already, so keep each image operation single-threaded
+        SHARP_CONCURRENCY: 1
       },
       env_production: {
         NODE_ENV: 'production',
-        PORT: 8000
+        PORT: 8000,
+        SHARP_CONCURRENCY: 1
       },
       error_file: './logs/backend_err.log',
       out_file: './logs/backend_out.log',
@@ -1,7 +1,15 @@
 const fs = require('fs');
+const http = require('http');
+const path = require('path');
 const FormData = require('form-data');
 const fetch = require('node-fetch');
 
+const API_BASE_URL = 'http://localhost:8000/api/v1';
+const DEFAULT_PROMPT = "A bedroom with a bohemian spirit centered around a relaxed canopy bed complemented by a large macrame wall hanging. An eclectic dresser serves as a unique storage solution while an array of potted plants brings life and color to the room";
+const IMAGE_EXTENSIONS = new Set(['.jpg', '.jpeg', '.png', '.webp', '.heic', '.heif']);
+// Requests kept in flight during a batch run; keep it below the server's MAX_CONCURRENT_GENERATIONS
+const DEFAULT_BATCH_CONCURRENCY = 4;
+
 /**
  * Example: Process an image with the Interior Design model
  * This demonstrates how to use the new /interior-design endpoint
@@ -10,9 +18,8 @@ const fetch = require('node-fetch');
 async function processImageWithInteriorDesign() {
   try {
     // Configuration
-    const API_BASE_URL = 'http://localhost:8000/api/v1';
     const IMAGE_PATH = './before_image.jpg'; // Update this path to your image
-    const PROMPT = "A bedroom with a bohemian spirit centered around a relaxed canopy bed complemented by a large macrame wall hanging. An eclectic dresser serves as a unique storage solution while an array of potted plants brings life and color to the room";
+    const PROMPT = DEFAULT_PROMPT;
     
     // Check if image exists
     if (!fs.existsSync(IMAGE_PATH)) {
@@ -111,8 +118,94 @@ async function testDifferentPrompts() {
   }
 }
 
+/**
+ * Example: Process every image in a directory with the Interior Design model
+ * A single keep-alive HTTP agent is reused for the whole run, so connections to the
+ * backend are set up once instead of once per image.
+ *
+ * Up to `concurrency` images are in flight at once, so a listing's photos are generated in
+ * parallel instead of one after another. Results keep the directory order, but each one is
+ * handed to onResult as soon as its image finishes, so callers can stream progress.
+ *
+ * Usage: node examples/interior-design-example.js --batch ./photos > results.jsonl
+ */
+async function processDirectoryWithInteriorDesign(
+  directory,
+  prompt = DEFAULT_PROMPT,
+  onResult = () => {},
+  concurrency = DEFAULT_BATCH_CONCURRENCY
+) {
+  const agent = new http.Agent({ keepAlive: true, maxSockets: concurrency });
+  const imagePaths = fs.readdirSync(directory)
+    .filter(name => IMAGE_EXTENSIONS.has(path.extname(name).toLowerCase()))
+    .map(name => path.join(directory, name));
+
+  // Progress goes to stderr so stdout stays clean JSON Lines in batch mode
+  console.error(`🚀 Processing ${imagePaths.length} images from ${directory}...`);
+
+  const processOne = async (imagePath) => {
+    const form = new FormData();
+    form.append('image', fs.createReadStream(imagePath));
+    form.append('prompt', prompt);
+
+    let outcome;
+    try {
+      const response = await fetch(`${API_BASE_URL}/interior-design`, {
+        method: 'POST',
+        body: form,
+        headers: {
+          ...form.getHeaders(),
+        },
+        agent,
+      });
+      const result = await response.json();
+      outcome = result.success
+        ? { path: imagePath, success: true, processedImage: result.processedImage }
+        : { path: imagePath, success: false, error: result.message };
+    } catch (error) {
+      outcome = { path: imagePath, success: false, error: error.message };
+    }
+
+    onResult(outcome);
+    return outcome;
+  };
+
+  const results = new Array(imagePaths.length);
+  let nextIndex = 0;
+  const worker = async () => {
+    while (nextIndex < imagePaths.length) {
+      const index = nextIndex++;
+      results[index] = await processOne(imagePaths[index]);
+    }
+  };
+
+  try {
+    await Promise.all(
+      Array.from({ length: Math.min(concurrency, imagePaths.length) }, worker)
+    );
+  } finally {
+    agent.destroy();
+  }
+
+  const succeeded = results.filter(result => result.success).length;
+  console.error(`✅ ${succeeded}/${results.length} images processed`);
+  return results;
+}
+
 // Main execution
-if (require.main === module) {
+const batchFlagIndex = process.argv.indexOf('--batch');
+
+if (require.main === module && batchFlagIndex !== -1) {
+  const directory = process.argv[batchFlagIndex + 1];
+  if (!directory || !fs.existsSync(directory)) {
+    console.error('❌ Usage: node examples/interior-design-example.js --batch <directory>');
+    process.exit(1);
+  }
+
+  processDirectoryWithInteriorDesign(directory, DEFAULT_PROMPT, result => {
+    process.stdout.write(`${JSON.stringify(result)}\n`);
+  });
+} else if (require.main === module) {
   console.log('🏠 Interior Design Model Example');
   console.log('================================\n');
   
@@ -133,5 +226,6 @@ if (require.main === module) {
 
 module.exports = {
   processImageWithInteriorDesign,
+  processDirectoryWithInteriorDesign,
   testDifferentPrompts
 };
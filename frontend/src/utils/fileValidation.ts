@@ -7,40 +7,40 @@ export interface FileValidationResult {
   error?: string;
 }
 
+const VALID_MIME_TYPES = new Set([
+  'image/jpeg',
+  'image/jpg',
+  'image/png',
+  'image/webp',
+  'image/heic',
+  'image/heif'
+]);
+
+const VALID_EXTENSIONS = new Set([
+  'jpg',
+  'jpeg',
+  'png',
+  'webp',
+  'heic',
+  'heif'
+]);
+
 /**
  * Check if a file type is valid for image uploads
  * Supports both MIME type and file extension validation for better HEIC compatibility
  */
 export function isValidImageFile(file: File): FileValidationResult {
-  const validMimeTypes = [
-    'image/jpeg',
-    'image/jpg', 
-    'image/png',
-    'image/webp',
-    'image/heic',
-    'image/heif'
-  ];
-
-  const validExtensions = [
-    'jpg',
-    'jpeg', 
-    'png',
-    'webp',
-    'heic',
-    'heif'
-  ];
-
   // Get file extension
   const fileExtension = file.name.toLowerCase().split('.').pop();
   
   // Check MIME type first
-  if (file.type && validMimeTypes.includes(file.type.toLowerCase())) {
+  if (file.type && VALID_MIME_TYPES.has(file.type.toLowerCase())) {
     return { isValid: true };
   }
   
   // If MIME type check fails or is empty, check file extension
   // This handles cases where browsers don't set correct MIME type for HEIC files
-  if (fileExtension && validExtensions.includes(fileExtension)) {
+  if (fileExtension && VALID_EXTENSIONS.has(fileExtension)) {
     return { isValid: true };
   }
   
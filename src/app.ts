@@ -4,7 +4,12 @@ import helmet from 'helmet';
 import compression from 'compression';
 import morgan from 'morgan';
 import path from 'path';
-import { config } from './config';
+import crypto from 'crypto';
+import { promises as fs } from 'fs';
+import zlib from 'zlib';
+import { promisify } from 'util';
+import sharp from 'sharp';
+import { config, configManager } from './config';
 import { logger } from './utils/logger';
 import { FileUtils } from './utils/fileUtils';
 import { errorHandler, notFoundHandler } from './middleware/errorHandler';
@@ -37,8 +42,43 @@ function getFrontendVersion(): string {
 
 const frontendVersion = getFrontendVersion();
 
+// Cap libvips threads per image operation (see SHARP_CONCURRENCY in env.example)
+if (config.sharpConcurrency > 0) {
+  sharp.concurrency(config.sharpConcurrency);
+}
+
+// Must outlive nginx's upstream keep-alive timeout (60s), otherwise Node can close an idle
+// socket just as nginx reuses it and the request fails with a 502
+const SERVER_KEEP_ALIVE_TIMEOUT_MS = 65000;
+
+const HOME_PAGE_PATH = path.join(process.cwd(), 'public/home.html');
+// Short max-age so a deploy is picked up quickly; the ETag lets browsers revalidate with a 304
+const HOME_PAGE_CACHE_CONTROL = 'public, max-age=300';
+
+// CORS headers for the uploaded/processed image routes, shared by every mount below
+const staticCorsHeaders: express.RequestHandler = (_req, res, next) => {
+  res.header('Access-Control-Allow-Origin', '*');
+  res.header('Access-Control-Allow-Methods', 'GET, OPTIONS');
+  res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With');
+  res.header('Access-Control-Expose-Headers', 'Content-Length, Content-Type');
+  res.header('Cross-Origin-Resource-Policy', 'cross-origin');
+  res.header('Cross-Origin-Embedder-Policy', 'unsafe-none');
+  next();
+};
+
+const gzip = promisify(zlib.gzip);
+const brotliCompress = promisify(zlib.brotliCompress);
+
+interface CachedPage {
+  body: Buffer;
+  gzip: Buffer;
+  brotli: Buffer;
+  etag: string;
+}
+
 class App {
   public app: express.Application;
+  private homePage: Promise<CachedPage> | undefined;
 
   constructor() {
     this.app = express();
@@ -117,25 +157,9 @@ class App {
     this.app.use(express.urlencoded({ extended: true, limit: '50mb' }));
 
     // Static file serving with CORS headers
-    this.app.use('/uploads', (_req, res, next) => {
-      res.header('Access-Control-Allow-Origin', '*');
-      res.header('Access-Control-Allow-Methods', 'GET, OPTIONS');
-      res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With');
-      res.header('Access-Control-Expose-Headers', 'Content-Length, Content-Type');
-      res.header('Cross-Origin-Resource-Policy', 'cross-origin');
-      res.header('Cross-Origin-Embedder-Policy', 'unsafe-none');
-      next();
-    }, express.static(path.join(process.cwd(), config.uploadDir)));
-
-    this.app.use('/outputs', (_req, res, next) => {
-      res.header('Access-Control-Allow-Origin', '*');
-      res.header('Access-Control-Allow-Methods', 'GET, OPTIONS');
-      res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With');
-      res.header('Access-Control-Expose-Headers', 'Content-Length, Content-Type');
-      res.header('Cross-Origin-Resource-Policy', 'cross-origin');
-      res.header('Cross-Origin-Embedder-Policy', 'unsafe-none');
-      next();
-    }, express.static(path.join(process.cwd(), config.outputDir)));
+    this.app.use('/uploads', staticCorsHeaders, express.static(path.join(process.cwd(), config.uploadDir)));
+
+    this.app.use('/outputs', staticCorsHeaders, express.static(path.join(process.cwd(), config.outputDir)));
 
     this.app.use('/js', express.static(path.join(process.cwd(), 'public/js')));
     this.app.use('/css', express.static(path.join(process.cwd(), 'public/css')));
@@ -162,39 +186,19 @@ class App {
     // }
 
     // Handle image requests with proper CORS
-    this.app.get('/uploads/*', (_req, res, next) => {
-      res.header('Access-Control-Allow-Origin', '*');
-      res.header('Access-Control-Allow-Methods', 'GET, OPTIONS');
-      res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With');
-      res.header('Access-Control-Expose-Headers', 'Content-Length, Content-Type');
-      res.header('Cross-Origin-Resource-Policy', 'cross-origin');
-      res.header('Cross-Origin-Embedder-Policy', 'unsafe-none');
-      next();
-    });
+    this.app.get('/uploads/*', staticCorsHeaders);
 
-    this.app.get('/outputs/*', (_req, res, next) => {
-      res.header('Access-Control-Allow-Origin', '*');
-      res.header('Access-Control-Allow-Methods', 'GET, OPTIONS');
-      res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With');
-      res.header('Access-Control-Expose-Headers', 'Content-Length, Content-Type');
-      res.header('Cross-Origin-Resource-Policy', 'cross-origin');
-      res.header('Cross-Origin-Embedder-Policy', 'unsafe-none');
-      next();
-    });
+    this.app.get('/outputs/*', staticCorsHeaders);
 
   }
 
   private initializeRoutes(): void {
 
     // Home page - main application interface
-    this.app.get('/', (_, res) => {
-      res.sendFile(path.join(process.cwd(), 'public/home.html'));
-    });
+    this.app.get('/', this.sendHomePage);
 
     // Alternative home route
-    this.app.get('/home', (_, res) => {
-      res.sendFile(path.join(process.cwd(), 'public/home.html'));
-    });
+    this.app.get('/home', this.sendHomePage);
 
     // Enhanced test interface
     this.app.get('/test-enhanced', (_, res) => {
@@ -217,6 +221,74 @@ class App {
 
   }
 
+  /**
+   * Read, hash and gzip/brotli-compress home.html once. Compression runs on the libuv
+   * thread pool and concurrent callers share the same promise; a failed load is retried
+   * on the next call.
+   */
+  private loadHomePage(): Promise<CachedPage> {
+    if (!this.homePage) {
+      this.homePage = (async (): Promise<CachedPage> => {
+        const body = await fs.readFile(HOME_PAGE_PATH);
+        // Compress once at max level; the compression middleware skips responses that already
+        // carry a Content-Encoding, so these are sent as-is
+        const [gzipBody, brotliBody] = await Promise.all([
+          gzip(body, { level: zlib.constants.Z_BEST_COMPRESSION }),
+          brotliCompress(body, {
+            params: { [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY },
+          }),
+        ]);
+        return {
+          body,
+          gzip: gzipBody,
+          brotli: brotliBody,
+          etag: crypto.createHash('md5').update(body).digest('hex'),
+        };
+      })();
+      this.homePage.catch(() => {
+        this.homePage = undefined;
+      });
+    }
+    return this.homePage;
+  }
+
+  /**
+   * Serve home.html from memory. The page is static, so in production it is read, hashed
+   * and gzip/brotli-compressed once (at startup) instead of on every visit.
+   */
+  private sendHomePage = async (req: express.Request, res: express.Response, next: express.NextFunction): Promise<void> => {
+    if (!configManager.isProduction()) {
+      // Keep serving from disk outside production so edits show up without a restart
+      res.sendFile(HOME_PAGE_PATH);
+      return;
+    }
+
+    try {
+      const page = await this.loadHomePage();
+      const encoding = req.acceptsEncodings('br', 'gzip', 'identity');
+      let payload = page.body;
+      let etag = page.etag;
+      if (encoding === 'br') {
+        payload = page.brotli;
+        etag += '-br';
+      } else if (encoding === 'gzip') {
+        payload = page.gzip;
+        etag += '-gz';
+      }
+
+      res.vary('Accept-Encoding');
+      res.setHeader('Cache-Control', HOME_PAGE_CACHE_CONTROL);
+      res.setHeader('ETag', `"${etag}"`);
+      if (payload !== page.body) {
+        res.setHeader('Content-Encoding', encoding as string);
+      }
+      // res.send answers 304 itself when If-None-Match matches the ETag above
+      res.type('html').send(payload);
+    } catch (error) {
+      next(error);
+    }
+  };
+
   private initializeErrorHandling(): void {
     // 404 handler
     this.app.use(notFoundHandler);
@@ -230,6 +302,16 @@ class App {
       // Initialize directories first
       await this.initializeDirectories();
 
+      // Compress the home page before accepting traffic so no visitor waits on it
+      if (configManager.isProduction()) {
+        try {
+          await this.loadHomePage();
+        } catch (error) {
+          // Not fatal: the first request to / retries the load
+          logger.warn('⚠️ Failed to preload home page', { error });
+        }
+      }
+
       // Import the frontend version from package.json
       // eslint-disable-next-line @typescript-eslint/no-var-requires
       
@@ -242,6 +324,9 @@ class App {
 
       });
 
+      server.keepAliveTimeout = SERVER_KEEP_ALIVE_TIMEOUT_MS;
+      server.headersTimeout = SERVER_KEEP_ALIVE_TIMEOUT_MS + 1000;
+
       // Graceful shutdown
       process.on('SIGTERM', () => {
         logger.info('SIGTERM received, shutting down gracefully...');
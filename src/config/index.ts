@@ -1,4 +1,6 @@
 import dotenv from 'dotenv';
+import fs from 'fs';
+import path from 'path';
 import { AppConfig } from '../types';
 
 // Load environment variables
@@ -43,9 +45,15 @@ class ConfigManager {
       logFormat: process.env.LOG_FORMAT || 'combined',
       uploadDir: process.env.UPLOAD_DIR || 'uploads',
       outputDir: process.env.OUTPUT_DIR || 'outputs',
-      tempDir: process.env.TEMP_DIR || 'temp',
+      tempDir: this.resolveTempDir(),
+      processingMaxDimension: parseInt(process.env.PROCESSING_MAX_DIMENSION || '1024', 10),
+      processingJpegQuality: parseInt(process.env.PROCESSING_JPEG_QUALITY || '85', 10),
       rateLimitWindowMs: parseInt(process.env.RATE_LIMIT_WINDOW_MS || '900000', 10), // 15 minutes
       rateLimitMaxRequests: parseInt(process.env.RATE_LIMIT_MAX_REQUESTS || '100', 10),
+      maxConcurrentGenerations: this.parseBoundedInt(process.env.MAX_CONCURRENT_GENERATIONS, 8, 1),
+      maxQueuedGenerations: this.parseBoundedInt(process.env.MAX_QUEUED_GENERATIONS, 32, 0),
+      batchEnhancementConcurrency: this.parseBoundedInt(process.env.BATCH_ENHANCEMENT_CONCURRENCY, 4, 1),
+      sharpConcurrency: parseInt(process.env.SHARP_CONCURRENCY || '0', 10), // 0 = sharp default (one thread per core)
       n8nWebhookUrl: process.env.N8N_WEBHOOK_URL || 'https://agents.n8n.bizaigpt.com/webhook/b408defb-315d-4676-b4c4-1dcebe81ffc0',
       // R2 Configuration
       r2AccountId: process.env.R2_ACCOUNT_ID || '',
@@ -58,6 +66,37 @@ class ConfigManager {
     };
   }
 
+  /**
+   * Resolve the scratch directory used for resized/converted images.
+   * An explicit TEMP_DIR always wins; USE_RAM_TEMP_DIR=true opts into a tmpfs-backed
+   * directory under /dev/shm (Linux only) so temp writes never touch the disk.
+   */
+  private resolveTempDir(): string {
+    if (process.env.TEMP_DIR) {
+      return process.env.TEMP_DIR;
+    }
+
+    if (process.env.USE_RAM_TEMP_DIR === 'true' && process.platform === 'linux') {
+      try {
+        fs.accessSync('/dev/shm', fs.constants.W_OK);
+        return path.join('/dev/shm', 'realvisionai');
+      } catch {
+        // /dev/shm is missing or read-only, fall back to the on-disk temp dir
+      }
+    }
+
+    return 'temp';
+  }
+
+  /**
+   * Parse an integer setting, falling back to the default when it is missing or not a number
+   * and clamping it to min (a limit of 0 or below would stall every request behind it).
+   */
+  private parseBoundedInt(value: string | undefined, defaultValue: number, min: number): number {
+    const parsed = parseInt(value || '', 10);
+    return Math.max(min, Number.isFinite(parsed) ? parsed : defaultValue);
+  }
+
   private validateConfig(): void {
     // Only require replicateApiToken in production
     if (this.config.nodeEnv === 'production') {
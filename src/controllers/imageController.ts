@@ -2,14 +2,16 @@ import { Request, Response } from 'express';
 import { AuthenticatedRequest } from '../middleware/authMiddleware';
 import path from 'path';
 import fs from 'fs';
+import { pipeline } from 'stream/promises';
 import { ReplicateService } from '../services/replicateService';
 import { InteriorDesignService } from '../services/interiorDesignService';
 import { AddFurnitureService } from '../services/addFurnitureService';
 import { ExteriorDesignService } from '../services/exteriorDesignService';
 import { SmartEffectsService, EffectType } from '../services/smartEffectsService';
 import { VideoMotionService, VideoMotionType } from '../services/videoMotionService';
-import { HybridStorageService } from '../services/hybridStorageService';
+import { HybridStorageService, StorageResult, hybridStorageService } from '../services/hybridStorageService';
 import { FileUtils } from '../utils/fileUtils';
+import { mapWithConcurrency } from '../utils/asyncUtils';
 import { logger } from '../utils/logger';
 import { config } from '../config';
 import { ProcessImageRequest, ProcessImageResponse, ApiResponse } from '../types';
@@ -33,7 +35,7 @@ export class ImageController {
     this.smartEffectsService = new SmartEffectsService();
     this.videoMotionService = new VideoMotionService();
     this.userStatsService = new UserStatisticsService();
-    this.storageService = new HybridStorageService();
+    this.storageService = hybridStorageService;
   }
 
   /**
@@ -54,6 +56,7 @@ export class ImageController {
   public health = async (_: Request, res: Response): Promise<void> => {
     try {
       const isReplicateConfigValid = await this.replicateService.validateConfiguration();
+      const timestamp = new Date().toISOString();
       
       res.json({
         success: true,
@@ -61,11 +64,11 @@ export class ImageController {
         data: {
           status: 'operational',
           version: config.appVersion,
-          timestamp: new Date().toISOString(),
+          timestamp,
           replicate_connection: isReplicateConfigValid,
           model: config.stableDiffusionModel,
         },
-        timestamp: new Date().toISOString(),
+        timestamp,
       } as ApiResponse);
     } catch (error) {
       logger.error('Health check failed', { error });
@@ -224,7 +227,8 @@ export class ImageController {
 
       // Upload original image to hybrid storage first
       let processImageOriginalStorageResult;
-      let processImageProcessingImagePath = req.file.path; // Default to disk path
+      const processImageProcessingImagePath = req.file.path; // Disk path (undefined in buffer mode)
+      const processImageInput: string | Buffer = req.file.buffer || processImageProcessingImagePath;
       
       if (req.file.buffer) {
         // File is in memory (R2 mode)
@@ -260,13 +264,7 @@ export class ImageController {
           key: processImageOriginalStorageResult.key
         });
         
-        // Save buffer to temporary file for processing
-        const tempFilename = req.file.filename || req.file.originalname || `temp_${Date.now()}.jpg`;
-        const tempPath = path.join(config.tempDir, `temp_${tempFilename}`);
-        await FileUtils.ensureDirectoryExists(config.tempDir);
-        await require('fs/promises').writeFile(tempPath, req.file.buffer);
-        processImageProcessingImagePath = tempPath;
-        tempFiles.push(tempPath);
+        // The resize step below reads straight from the upload buffer, so nothing is written to disk
       } else {
         // File is on disk (local mode)
         processImageOriginalStorageResult = await this.storageService.uploadFile(
@@ -308,13 +306,17 @@ export class ImageController {
       // Duplicate section removed - upload logic is handled above
 
       // Resize image if needed to optimize processing
-      // Use the same fallback logic as temp filename to ensure filename is always defined
-      const resizedFilename = req.file.filename || req.file.originalname || `temp_${Date.now()}.jpg`;
-      const resizedImagePath = path.join(config.tempDir, `resized_${resizedFilename}`);
+      // The resized image only gets base64-encoded for Replicate, so keep it in memory
+      // instead of writing a resized_ temp file and reading it straight back
+      let processingImage: string | Buffer = processImageInput;
       
       try {
-        await FileUtils.resizeImageIfNeeded(processImageProcessingImagePath, resizedImagePath, 1024, 1024);
-        tempFiles.push(resizedImagePath);
+        processingImage = await FileUtils.resizeImageToBuffer(
+          processImageInput,
+          config.processingMaxDimension,
+          config.processingMaxDimension,
+          config.processingJpegQuality
+        );
       } catch (resizeError) {
         const resizeErr = resizeError as Error;
         logger.warn('Image resize failed, checking if it\'s a HEIC file that can be processed directly', {
@@ -324,15 +326,15 @@ export class ImageController {
         });
         
         // Check if this is a HEIC file that failed to resize
-        // Use processImageProcessingImagePath instead of req.file.path (which may not exist in buffer mode)
-        const fileExtension = path.extname(processImageProcessingImagePath).toLowerCase();
+        // req.file.path does not exist in buffer mode, so fall back to the original filename
+        const fileExtension = path.extname(processImageProcessingImagePath || req.file.originalname).toLowerCase();
         const isHeic = fileExtension === '.heic' || fileExtension === '.heif';
         
         if (isHeic) {
           try {
             // Try to validate the HEIC file can be processed
             const sharp = require('sharp');
-            const metadata = await sharp(processImageProcessingImagePath).metadata();
+            const metadata = await sharp(processImageInput).metadata();
             
             if (metadata.width && metadata.height) {
               logger.info('HEIC file is valid, proceeding without resize', {
@@ -341,7 +343,7 @@ export class ImageController {
                 format: metadata.format
               });
               
-              // Use the original file path for processing
+              // Use the original upload (buffer or file path) for processing
               // The AI model may be able to handle HEIC files directly
             } else {
               throw new Error('HEIC file has invalid dimensions');
@@ -364,7 +366,7 @@ export class ImageController {
 
       // Process image with Replicate
       const { outputUrl, metadata } = await this.replicateService.processImage(
-        resizedImagePath,
+        processingImage,
         processRequest
       );
 
@@ -507,7 +509,7 @@ export class ImageController {
 
       // Upload original image to hybrid storage first
       let interiorDesignOriginalStorageResult;
-      let interiorDesignProcessingImagePath = req.file.path; // Default to disk path
+      const interiorDesignProcessingImagePath = req.file.path; // Disk path (undefined in buffer mode)
       
       if (req.file.buffer) {
         // File is in memory (R2 mode)
@@ -528,13 +530,7 @@ export class ImageController {
           }
         );
         
-        // Save buffer to temporary file for processing
-        const tempFilename = req.file.filename || req.file.originalname || `temp_${Date.now()}.jpg`;
-        const tempPath = path.join(config.tempDir, `temp_${tempFilename}`);
-        await FileUtils.ensureDirectoryExists(config.tempDir);
-        await require('fs/promises').writeFile(tempPath, req.file.buffer);
-        interiorDesignProcessingImagePath = tempPath;
-        tempFiles.push(tempPath);
+        // The resize step below reads straight from the upload buffer, so nothing is written to disk
       } else {
         // File is on disk (local mode)
         interiorDesignOriginalStorageResult = await this.storageService.uploadFile(
@@ -583,14 +579,17 @@ export class ImageController {
       if (req.body?.negativePrompt) options.negativePrompt = req.body.negativePrompt;
 
       // Resize image if needed to optimize processing
-      // Use the same fallback logic as temp filename to ensure filename is always defined
-      const resizedFilename = req.file.filename || req.file.originalname || `temp_${Date.now()}.jpg`;
-      const resizedImagePath = path.join(config.tempDir, `resized_${resizedFilename}`);
-      let finalImagePath = resizedImagePath;
+      // The resized image is only base64-encoded for Replicate, so keep it in memory
+      const interiorDesignInput: string | Buffer = req.file.buffer || interiorDesignProcessingImagePath;
+      let finalImage: string | Buffer;
       
       try {
-        await FileUtils.resizeImageIfNeeded(interiorDesignProcessingImagePath, resizedImagePath, 1024, 1024);
-        tempFiles.push(resizedImagePath);
+        finalImage = await FileUtils.resizeImageToBuffer(
+          interiorDesignInput,
+          config.processingMaxDimension,
+          config.processingMaxDimension,
+          config.processingJpegQuality
+        );
       } catch (resizeError) {
         const resizeErr = resizeError as Error;
         logger.warn('Image resize failed, checking if it\'s a HEIC file that can be processed directly', {
@@ -600,8 +599,8 @@ export class ImageController {
         });
         
         // Check if this is a HEIC file that failed to resize
-        // Use interiorDesignProcessingImagePath instead of req.file.path (which may not exist in buffer mode)
-        const fileExtension = path.extname(interiorDesignProcessingImagePath).toLowerCase();
+        // req.file.path does not exist in buffer mode, so fall back to the original filename
+        const fileExtension = path.extname(interiorDesignProcessingImagePath || req.file.originalname).toLowerCase();
         if (fileExtension === '.heic' || fileExtension === '.heif') {
           // This is a HEIC file that couldn't be resized - likely incompatible format
           const errorMessage = resizeErr.message;
@@ -623,12 +622,13 @@ export class ImageController {
           }
         }
         
-        // For other resize errors, try to use the original file
+        // For other resize errors, try to use the original upload (buffer or file path) as-is
         logger.info('Using original file for processing due to resize failure', {
           originalPath: interiorDesignProcessingImagePath,
+          isBuffer: !!req.file.buffer,
           error: resizeErr.message
         });
-        finalImagePath = interiorDesignProcessingImagePath;
+        finalImage = interiorDesignInput;
       }
 
       // Upload original image to hybrid storage first
@@ -643,10 +643,11 @@ export class ImageController {
       // Process image with Interior Design service
       try {
         const { outputUrl, metadata } = await this.interiorDesignService.generateInteriorDesign(
-          finalImagePath,
+          finalImage,
           req.body.prompt,
-          req.body.designType || 'modern',
-          req.body.style || 'realistic'
+          designType,
+          style,
+          fullPrompt
         );
 
         // Download and save processed image to hybrid storage
@@ -946,8 +947,16 @@ export class ImageController {
         return;
       }
       
-      // Process all images in parallel
-      const enhancementPromises = imageFiles.map(async (imageFile, index) => {
+      // Process images in parallel, but only a few at a time so a 20-image batch doesn't
+      // hold 20 uploads, storage writes and Replicate predictions open at once
+      const enhanceImageFile = async (imageFile: Express.Multer.File, index: number): Promise<{
+        originalImage: string;
+        enhancedImage: string;
+        enhancedStorageKey: string;
+        enhancedStorageType: StorageResult['storageType'];
+        filename: string;
+        generationId: string;
+      }> => {
         try {
           logger.info(`🔄 Processing image ${index + 1}/${imageFiles.length}: ${imageFile.filename}`);
           
@@ -1055,10 +1064,10 @@ export class ImageController {
           
           throw error;
         }
-      });
+      };
 
       // Wait for all enhancements to complete
-      const results = await Promise.all(enhancementPromises);
+      const results = await mapWithConcurrency(imageFiles, config.batchEnhancementConcurrency, enhanceImageFile);
 
       const processingTime = Date.now() - startTime;
 
@@ -1395,7 +1404,6 @@ export class ImageController {
    */
   public addFurnitures = async (req: AuthenticatedRequest, res: Response): Promise<void> => {
     const startTime = Date.now();
-    const tempFiles: string[] = [];
     let generationId: string | undefined;
     let responseSent = false;
 
@@ -1457,39 +1465,40 @@ export class ImageController {
         userId
       });
 
-      // Upload original room image to hybrid storage first
-      let roomImageStorageResult;
-      let roomImageProcessingPath = roomImageFile.path; // Default to disk path
-      
-      if (roomImageFile.buffer) {
-        // File is in memory (R2 mode)
-        // Ensure filename matches MIME type (fix for HEIC conversion)
-        let roomStorageFilename = roomImageFile.originalname;
-        if (roomImageFile.mimetype === 'image/webp' && !roomStorageFilename.endsWith('.webp')) {
-          roomStorageFilename = roomStorageFilename.replace(/\.[^.]+$/, '.webp');
-        }
-        
-        roomImageStorageResult = await this.storageService.uploadBuffer(
-          roomImageFile.buffer,
-          this.storageService.generateKey(roomStorageFilename),
-          roomImageFile.mimetype,
-          {
-            originalName: roomStorageFilename,
-            uploadedAt: new Date().toISOString(),
-            userId: req.user?.id || 'anonymous',
+      // In R2 mode the in-memory upload buffers are handed to the service as-is,
+      // so nothing is written to the temp dir for processing
+      const roomImageInput: string | Buffer = roomImageFile.buffer || roomImageFile.path;
+      const furnitureImageInput: string | Buffer | undefined = furnitureImageFile
+        ? furnitureImageFile.buffer || furnitureImageFile.path
+        : undefined;
+
+      // Upload the room image and the optional furniture image to hybrid storage.
+      // The two uploads are independent, so run them concurrently instead of back to back.
+      const storeRoomImage = async (): Promise<StorageResult> => {
+        if (roomImageFile.buffer) {
+          // File is in memory (R2 mode)
+          // Ensure filename matches MIME type (fix for HEIC conversion)
+          let roomStorageFilename = roomImageFile.originalname;
+          if (roomImageFile.mimetype === 'image/webp' && !roomStorageFilename.endsWith('.webp')) {
+            roomStorageFilename = roomStorageFilename.replace(/\.[^.]+$/, '.webp');
           }
-        );
-        
-        // Save buffer to temporary file for processing
-        const tempFilename = roomImageFile.filename || roomImageFile.originalname || `temp_${Date.now()}.jpg`;
-        const tempPath = path.join(config.tempDir, `temp_${tempFilename}`);
-        await FileUtils.ensureDirectoryExists(config.tempDir);
-        await require('fs/promises').writeFile(tempPath, roomImageFile.buffer);
-        roomImageProcessingPath = tempPath;
-        tempFiles.push(tempPath);
-      } else {
+
+          const storageResult = await this.storageService.uploadBuffer(
+            roomImageFile.buffer,
+            this.storageService.generateKey(roomStorageFilename),
+            roomImageFile.mimetype,
+            {
+              originalName: roomStorageFilename,
+              uploadedAt: new Date().toISOString(),
+              userId: req.user?.id || 'anonymous',
+            }
+          );
+
+          return storageResult;
+        }
+
         // File is on disk (local mode)
-        roomImageStorageResult = await this.storageService.uploadFile(
+        return this.storageService.uploadFile(
           roomImageFile.path,
           undefined, // Let storage service generate key
           roomImageFile.mimetype,
@@ -1499,13 +1508,13 @@ export class ImageController {
             userId: req.user?.id || 'anonymous',
           }
         );
-      }
+      };
+
+      const storeFurnitureImage = async (): Promise<StorageResult | null> => {
+        if (!furnitureImageFile) {
+          return null;
+        }
 
-      // Upload furniture image to hybrid storage if provided
-      let furnitureImageStorageResult = null;
-      let furnitureImageProcessingPath = furnitureImageFile?.path;
-      
-      if (furnitureImageFile) {
         if (furnitureImageFile.buffer) {
           // File is in memory (R2 mode)
           // Ensure filename matches MIME type (fix for HEIC conversion)
@@ -1513,8 +1522,8 @@ export class ImageController {
           if (furnitureImageFile.mimetype === 'image/webp' && !furnitureStorageFilename.endsWith('.webp')) {
             furnitureStorageFilename = furnitureStorageFilename.replace(/\.[^.]+$/, '.webp');
           }
-          
-          furnitureImageStorageResult = await this.storageService.uploadBuffer(
+
+          const storageResult = await this.storageService.uploadBuffer(
             furnitureImageFile.buffer,
             this.storageService.generateKey(furnitureStorageFilename),
             furnitureImageFile.mimetype,
@@ -1524,31 +1533,30 @@ export class ImageController {
               userId: req.user?.id || 'anonymous',
             }
           );
-          
-          // Save buffer to temporary file for processing
-          const tempFilename = furnitureImageFile.filename || furnitureImageFile.originalname || `temp_${Date.now()}.jpg`;
-          const tempPath = path.join(config.tempDir, `temp_${tempFilename}`);
-          await FileUtils.ensureDirectoryExists(config.tempDir);
-          await require('fs/promises').writeFile(tempPath, furnitureImageFile.buffer);
-          furnitureImageProcessingPath = tempPath;
-          tempFiles.push(tempPath);
-        } else {
-          // File is on disk (local mode)
-          furnitureImageStorageResult = await this.storageService.uploadFile(
-            furnitureImageFile.path,
-            undefined, // Let storage service generate key
-            furnitureImageFile.mimetype,
-            {
-              originalName: furnitureImageFile.originalname,
-              uploadedAt: new Date().toISOString(),
-              userId: req.user?.id || 'anonymous',
-            }
-          );
+
+          return storageResult;
         }
-      }
+
+        // File is on disk (local mode)
+        return this.storageService.uploadFile(
+          furnitureImageFile.path,
+          undefined, // Let storage service generate key
+          furnitureImageFile.mimetype,
+          {
+            originalName: furnitureImageFile.originalname,
+            uploadedAt: new Date().toISOString(),
+            userId: req.user?.id || 'anonymous',
+          }
+        );
+      };
+
+      const [roomImageStorageResult, furnitureImageStorageResult] = await Promise.all([
+        storeRoomImage(),
+        storeFurnitureImage(),
+      ]);
 
       // Generate the full prompt first (includes base prompt from .env)
-      const hasFurnitureImage = !!furnitureImageProcessingPath;
+      const hasFurnitureImage = !!furnitureImageInput;
       const fullPrompt = this.addFurnitureService.generateFurniturePrompt(
         req.body.prompt,
         hasFurnitureImage
@@ -1565,8 +1573,8 @@ export class ImageController {
 
       // Process the furniture addition
       const result = await this.addFurnitureService.addFurniture(
-        roomImageProcessingPath,
-        furnitureImageProcessingPath || null,
+        roomImageInput,
+        furnitureImageInput || null,
         req.body.prompt,
         req.body.furnitureType || 'general'
       );
@@ -1688,16 +1696,6 @@ export class ImageController {
           timestamp: new Date().toISOString(),
         } as ApiResponse);
       }
-    } finally {
-      // Clean up temporary files
-      for (const tempFile of tempFiles) {
-        try {
-          const fs = require('fs');
-          fs.unlinkSync(tempFile);
-        } catch (error) {
-          logger.warn('Failed to clean up temp file:', { tempFile });
-        }
-      }
     }
   };
 
@@ -1839,7 +1837,8 @@ export class ImageController {
         buildingImageProcessingPath,
         req.body.designPrompt,
         designType,
-        style
+        style,
+        fullPrompt
       );
 
       if (result.outputUrl) {
@@ -1959,14 +1958,7 @@ export class ImageController {
       } as ApiResponse);
     } finally {
       // Clean up temporary files
-      for (const tempFile of tempFiles) {
-        try {
-          const fs = require('fs');
-          fs.unlinkSync(tempFile);
-        } catch (error) {
-          logger.warn('Failed to clean up temp file:', { tempFile });
-        }
-      }
+      await FileUtils.cleanupTempFiles(tempFiles);
     }
   };
 
@@ -2233,14 +2225,7 @@ export class ImageController {
       } as ApiResponse);
     } finally {
       // Clean up temporary files
-      for (const tempFile of tempFiles) {
-        try {
-          const fs = require('fs');
-          fs.unlinkSync(tempFile);
-        } catch (error) {
-          logger.warn('Failed to clean up temp file:', { tempFile });
-        }
-      }
+      await FileUtils.cleanupTempFiles(tempFiles);
     }
   };
 
@@ -2464,14 +2449,7 @@ export class ImageController {
       } as ApiResponse);
     } finally {
       // Clean up temporary files
-      for (const tempFile of tempFiles) {
-        try {
-          const fs = require('fs');
-          fs.unlinkSync(tempFile);
-        } catch (error) {
-          logger.warn('Failed to clean up temp file:', { tempFile });
-        }
-      }
+      await FileUtils.cleanupTempFiles(tempFiles);
     }
   };
 
@@ -2591,19 +2569,32 @@ export class ImageController {
           // Check if storage service has R2 enabled
           const storageServiceAny = this.storageService as any;
           if (storageServiceAny.useR2 && storageServiceAny.r2Service) {
-            const { buffer, contentType } = await storageServiceAny.r2Service.getFileBuffer(key);
+            const { stream, contentType, contentLength } = await storageServiceAny.r2Service.getFileStream(key);
             
             // Set CORS headers
             res.setHeader('Access-Control-Allow-Origin', '*');
             res.setHeader('Access-Control-Allow-Methods', 'GET');
             res.setHeader('Content-Type', contentType);
-            res.setHeader('Content-Length', buffer.length);
+            if (contentLength !== undefined) {
+              res.setHeader('Content-Length', contentLength);
+            }
             res.setHeader('Content-Disposition', `attachment; filename="${key.split('/').pop() || 'image.jpg'}"`);
             
-            res.send(buffer);
+            // Pipe the object straight to the client instead of buffering all of it first
+            await pipeline(stream, res);
             return;
           }
         } catch (r2Error) {
+          if (res.headersSent) {
+            // Failed mid-stream - too late to fall back, just drop the connection
+            logger.error('R2 proxy stream failed after headers were sent', {
+              error: r2Error instanceof Error ? r2Error.message : String(r2Error),
+              key
+            });
+            res.destroy();
+            return;
+          }
+
           logger.warn('Failed to get from R2, falling back to direct fetch', {
             error: r2Error instanceof Error ? r2Error.message : String(r2Error),
             key
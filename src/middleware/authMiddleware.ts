@@ -15,6 +15,28 @@ export interface AuthenticatedRequest extends Request {
   };
 }
 
+// Users already upgraded to 'CompleteRegistration' in this process, so their later requests can
+// skip the profile lookup below. Supabase logins reload the profile anyway and drop the entry if
+// it is back at 'Lead' or null; the oldest entry is evicted once the cap is hit.
+const completedRegistrationUserIds = new Set<string>();
+const MAX_COMPLETED_REGISTRATION_IDS = 10000;
+
+interface RegistrationProfile {
+  meta_event_name: string | null;
+  created_at: string;
+}
+
+function rememberCompletedRegistration(userId: string): void {
+  if (completedRegistrationUserIds.size >= MAX_COMPLETED_REGISTRATION_IDS) {
+    // Sets iterate in insertion order, so the first entry is the oldest
+    const oldest = completedRegistrationUserIds.values().next().value;
+    if (oldest !== undefined) {
+      completedRegistrationUserIds.delete(oldest);
+    }
+  }
+  completedRegistrationUserIds.add(userId);
+}
+
 /**
  * Middleware to authenticate JWT tokens or Supabase access tokens
  */
@@ -34,6 +56,8 @@ export const authenticateToken = async (
 
     // First try to verify as JWT token
     let decoded = authService.verifyToken(token);
+    // Set when the Supabase path has already loaded the profile, so the registration sync reuses it
+    let loadedProfile: RegistrationProfile | undefined;
 
     if (!decoded) {
       // If JWT verification fails, try to verify as Supabase token
@@ -91,6 +115,12 @@ export const authenticateToken = async (
           }
         } else {
           // Profile exists, use it
+          if (profile.meta_event_name === 'CompleteRegistration') {
+            rememberCompletedRegistration(profile.id);
+          } else {
+            completedRegistrationUserIds.delete(profile.id);
+          }
+          loadedProfile = profile;
           decoded = {
             id: profile.id,
             email: profile.email,
@@ -117,84 +147,12 @@ export const authenticateToken = async (
     // This happens when user successfully logs in and accesses any protected route
     // Flow: User enters email → SQL trigger sets meta_event_name = 'Lead' → User accesses platform → Upgrade to 'CompleteRegistration'
     // Fire and forget - don't block the request if this fails
-    (async () => {
-      try {
-        const { data: profile } = await supabase
-          .from('user_profiles')
-          .select('meta_event_name, created_at')
-          .eq('id', decoded.id)
-          .single();
-
-        // If meta_event_name is 'Lead' or null, user just logged in and is accessing the platform
-        // Update to 'CompleteRegistration' and send event to n8n
-        if (profile && (profile.meta_event_name === 'Lead' || profile.meta_event_name === null)) {
-          logger.info(`🔄 [authenticateToken] User ${decoded.email} accessing platform - upgrading to CompleteRegistration`, {
-            current_meta_event_name: profile.meta_event_name ?? 'null',
-            userId: decoded.id
-          });
-          
-          // If meta_event_name is null, set it to 'Lead' first (in case trigger didn't set it)
-          if (profile.meta_event_name === null) {
-            logger.info(`⚠️ [authenticateToken] meta_event_name is null for ${decoded.email}, setting to 'Lead' first`);
-            await supabase
-              .from('user_profiles')
-              .update({ 
-                meta_event_name: 'Lead',
-                updated_at: new Date().toISOString()
-              })
-              .eq('id', decoded.id);
-          }
-          
-          // Import here to avoid circular dependency
-          const conversionEventService = (await import('../services/conversionEventService')).default;
-          
-          // Send CompleteRegistration event to n8n
-          const referer = req.headers.referer || req.headers.referrer;
-          const eventSourceUrl = Array.isArray(referer) ? referer[0] : referer;
-          const userAgent = req.headers['user-agent'];
-          const userAgentStr = Array.isArray(userAgent) ? userAgent[0] : userAgent;
-          
-          const conversionPayload: ConversionEventPayload = {
-            email: decoded.email,
-            externalId: decoded.id,
-            createdAt: profile.created_at,
-            ...(req.ip && { ip: req.ip }),
-            ...(userAgentStr && { userAgent: userAgentStr }),
-            ...(eventSourceUrl && { eventSourceUrl }),
-          };
-
-          logger.info(`📤 [authenticateToken] Sending CompleteRegistration event for ${decoded.email}`);
-          conversionEventService.sendConversionEvent('CompleteRegistration', conversionPayload).catch((error) => {
-            logger.error(`❌ [authenticateToken] Failed to send CompleteRegistration event for ${decoded.email}:`, error);
-          });
-
-          // Update meta_event_name to 'CompleteRegistration'
-          const { error: updateError } = await supabase
-            .from('user_profiles')
-            .update({ 
-              meta_event_name: 'CompleteRegistration',
-              updated_at: new Date().toISOString()
-            })
-            .eq('id', decoded.id);
-
-          if (updateError) {
-            logger.error(`❌ [authenticateToken] Failed to update meta_event_name for ${decoded.email}:`, {
-              error: updateError.message || String(updateError),
-              code: updateError.code
-            });
-          } else {
-            logger.info(`✅ [authenticateToken] Successfully updated meta_event_name to 'CompleteRegistration' for ${decoded.email}`);
-          }
-        } else if (profile && profile.meta_event_name === 'CompleteRegistration') {
-          logger.debug(`ℹ️ [authenticateToken] User ${decoded.email} already has CompleteRegistration status`);
-        }
-      } catch (error) {
-        // Silently log - don't block the request
-        logger.debug(`[authenticateToken] Error checking meta_event_name for ${decoded.email}:`, {
-          error: error instanceof Error ? error.message : String(error)
-        });
-      }
-    })();
+    // Skipped without a query once the user is known to have completed registration
+    if (!completedRegistrationUserIds.has(decoded.id)) {
+      syncRegistrationEvent(req, decoded.id, decoded.email, loadedProfile).catch((error) => {
+        logger.error(`❌ [authenticateToken] Registration event sync failed for ${decoded.email}:`, error);
+      });
+    }
 
     next();
   } catch (error) {
@@ -203,6 +161,95 @@ export const authenticateToken = async (
   }
 };
 
+/**
+ * Upgrade a user's meta_event_name to 'CompleteRegistration' and send the matching event to n8n
+ */
+async function syncRegistrationEvent(
+  req: AuthenticatedRequest,
+  userId: string,
+  email: string,
+  loadedProfile: RegistrationProfile | undefined
+): Promise<void> {
+  try {
+    const profile: RegistrationProfile | null = loadedProfile ?? (await supabase
+      .from('user_profiles')
+      .select('meta_event_name, created_at')
+      .eq('id', userId)
+      .single()).data;
+
+    // If meta_event_name is 'Lead' or null, user just logged in and is accessing the platform
+    // Update to 'CompleteRegistration' and send event to n8n
+    if (profile && (profile.meta_event_name === 'Lead' || profile.meta_event_name === null)) {
+      logger.info(`🔄 [authenticateToken] User ${email} accessing platform - upgrading to CompleteRegistration`, {
+        current_meta_event_name: profile.meta_event_name ?? 'null',
+        userId
+      });
+
+      // If meta_event_name is null, set it to 'Lead' first (in case trigger didn't set it)
+      if (profile.meta_event_name === null) {
+        logger.info(`⚠️ [authenticateToken] meta_event_name is null for ${email}, setting to 'Lead' first`);
+        await supabase
+          .from('user_profiles')
+          .update({ 
+            meta_event_name: 'Lead',
+            updated_at: new Date().toISOString()
+          })
+          .eq('id', userId);
+      }
+
+      // Import here to avoid circular dependency
+      const conversionEventService = (await import('../services/conversionEventService')).default;
+
+      // Send CompleteRegistration event to n8n
+      const referer = req.headers.referer || req.headers.referrer;
+      const eventSourceUrl = Array.isArray(referer) ? referer[0] : referer;
+      const userAgent = req.headers['user-agent'];
+      const userAgentStr = Array.isArray(userAgent) ? userAgent[0] : userAgent;
+
+      const conversionPayload: ConversionEventPayload = {
+        email,
+        externalId: userId,
+        createdAt: profile.created_at,
+        ...(req.ip && { ip: req.ip }),
+        ...(userAgentStr && { userAgent: userAgentStr }),
+        ...(eventSourceUrl && { eventSourceUrl }),
+      };
+
+      logger.info(`📤 [authenticateToken] Sending CompleteRegistration event for ${email}`);
+      conversionEventService.sendConversionEvent('CompleteRegistration', conversionPayload).catch((error) => {
+        logger.error(`❌ [authenticateToken] Failed to send CompleteRegistration event for ${email}:`, error);
+      });
+
+      // Update meta_event_name to 'CompleteRegistration'
+      const { error: updateError } = await supabase
+        .from('user_profiles')
+        .update({ 
+          meta_event_name: 'CompleteRegistration',
+          updated_at: new Date().toISOString()
+        })
+        .eq('id', userId);
+
+      if (updateError) {
+        logger.error(`❌ [authenticateToken] Failed to update meta_event_name for ${email}:`, {
+          error: updateError.message || String(updateError),
+          code: updateError.code
+        });
+      } else {
+        rememberCompletedRegistration(userId);
+        logger.info(`✅ [authenticateToken] Successfully updated meta_event_name to 'CompleteRegistration' for ${email}`);
+      }
+    } else if (profile && profile.meta_event_name === 'CompleteRegistration') {
+      rememberCompletedRegistration(userId);
+      logger.debug(`ℹ️ [authenticateToken] User ${email} already has CompleteRegistration status`);
+    }
+  } catch (error) {
+    // Silently log - don't block the request
+    logger.debug(`[authenticateToken] Error checking meta_event_name for ${email}:`, {
+      error: error instanceof Error ? error.message : String(error)
+    });
+  }
+}
+
 /**
  * Middleware to require admin role
  */
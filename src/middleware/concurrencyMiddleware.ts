@@ -0,0 +1,114 @@
+import { Request, Response, NextFunction, RequestHandler } from 'express';
+import { logger } from '../utils/logger';
+import { ApiResponse } from '../types';
+
+interface GenerationSlot {
+  hold: () => void;
+  release: () => void;
+}
+
+/**
+ * Limit how many requests run the rest of a route's middleware chain at once in this process.
+ * Requests over maxConcurrent wait in a FIFO queue; once maxQueued requests are waiting, new
+ * ones are rejected with 503 instead of piling up multi-MB uploads in memory.
+ *
+ * Wrap the route's handler in holdGenerationSlot so the slot is held until the handler has
+ * finished, not just until the response is sent or the client disconnects.
+ */
+export const limitConcurrency = (maxConcurrent: number, maxQueued: number): RequestHandler => {
+  let active = 0;
+  const waiting: Array<() => void> = [];
+
+  const release = (): void => {
+    const startNext = waiting.shift();
+    if (startNext) {
+      // Hand the slot straight to the next queued request
+      startNext();
+    } else {
+      active--;
+    }
+  };
+
+  return (req: Request, res: Response, next: NextFunction): void => {
+    const start = (): void => {
+      let released = false;
+      let held = false;
+      const releaseOnce = (): void => {
+        if (!released) {
+          released = true;
+          release();
+        }
+      };
+
+      // Requests that end before reaching the handler (upload errors, aborted uploads)
+      // give the slot back here; once the handler holds it, only the handler releases it
+      const releaseIfNotHeld = (): void => {
+        if (!held) {
+          releaseOnce();
+        }
+      };
+
+      const slot: GenerationSlot = {
+        hold: () => {
+          held = true;
+        },
+        release: releaseOnce,
+      };
+      res.locals.generationSlot = slot;
+
+      res.once('finish', releaseIfNotHeld);
+      res.once('close', releaseIfNotHeld);
+      next();
+    };
+
+    if (active < maxConcurrent) {
+      active++;
+      start();
+      return;
+    }
+
+    if (waiting.length >= maxQueued) {
+      logger.warn('Generation queue is full, rejecting request', {
+        path: req.path,
+        active,
+        queued: waiting.length,
+      });
+
+      res.status(503).json({
+        success: false,
+        message: 'Server is busy, please try again in a moment',
+        error: 'SERVER_BUSY',
+        timestamp: new Date().toISOString(),
+      } as ApiResponse);
+      return;
+    }
+
+    waiting.push(start);
+
+    // Drop the request from the queue if the client gives up while waiting
+    res.once('close', () => {
+      const index = waiting.indexOf(start);
+      if (index !== -1) {
+        waiting.splice(index, 1);
+      }
+    });
+  };
+};
+
+/**
+ * Keep the slot taken by limitConcurrency until the handler settles, so a client that
+ * disconnects mid-prediction doesn't let the next queued request start alongside it.
+ */
+export const holdGenerationSlot = (
+  fn: (req: Request, res: Response, next: NextFunction) => Promise<void>
+): ((req: Request, res: Response, next: NextFunction) => Promise<void>) => {
+  return async (req: Request, res: Response, next: NextFunction): Promise<void> => {
+    const slot = res.locals.generationSlot as GenerationSlot | undefined;
+    slot?.hold();
+    try {
+      await fn(req, res, next);
+    } finally {
+      slot?.release();
+    }
+  };
+};
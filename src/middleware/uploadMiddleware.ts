@@ -1,7 +1,7 @@
 import multer from 'multer';
-import { Request, Response, NextFunction } from 'express';
+import { Request, Response, NextFunction, RequestHandler } from 'express';
 import { config } from '../config';
-import { FileUtils } from '../utils/fileUtils';
+import { FileUtils, WEBP_OPTIONS } from '../utils/fileUtils';
 import { logger } from '../utils/logger';
 import path from 'path';
 
@@ -38,15 +38,41 @@ const getStorage = () => {
 // Storage configuration
 const storage = getStorage();
 
+// Allowed types are fixed at startup, so build the lookup set and error message once
+const ALLOWED_MIME_TYPES = new Set(config.allowedFileTypes);
+const HEIC_EXTENSIONS = new Set(['heic', 'heif']);
+const INVALID_FILE_TYPE_MESSAGE = `Invalid file type. Allowed types: ${config.allowedFileTypes.join(', ')}`;
+
+// HEIC/HEIF detection patterns, built once instead of on every validated upload
+const HEIC_SIGNATURES = [
+  Buffer.from([0x00, 0x00, 0x00, 0x20, 0x66, 0x74, 0x79, 0x70]), // HEIC
+  Buffer.from([0x00, 0x00, 0x00, 0x18, 0x66, 0x74, 0x79, 0x70]), // HEIF
+];
+const HEIC_FILENAME_PATTERN = /\.(heic|heif)$/i;
+
+// busboy decodes multipart filename parameters as latin1, so UTF-8 names (accents, emoji,
+// non-Latin scripts) arrive garbled. Re-decode as UTF-8 when the bytes are valid UTF-8, keep
+// the latin1 reading otherwise, and strip any client-supplied directory components.
+const normalizeOriginalName = (originalName: string): string => {
+  // Characters above U+00FF mean the name was already decoded as UTF-8 upstream
+  const isLatin1 = !/[^\u0000-\u00ff]/.test(originalName);
+  const utf8Name = isLatin1 ? Buffer.from(originalName, 'latin1').toString('utf8') : originalName;
+  const name = utf8Name.includes('\uFFFD') ? originalName : utf8Name;
+  return path.basename(name.replace(/\\/g, '/'));
+};
+
 // File filter
 const fileFilter = (_: Request, file: Express.Multer.File, cb: multer.FileFilterCallback): void => {
+  // Runs before the storage engine, so the disk filename and later handlers see the fixed name
+  file.originalname = normalizeOriginalName(file.originalname);
+
   logger.debug('File filter check', { 
     mimetype: file.mimetype,
     originalname: file.originalname 
   });
 
   // Check mimetype first
-  if (config.allowedFileTypes.includes(file.mimetype)) {
+  if (ALLOWED_MIME_TYPES.has(file.mimetype)) {
     cb(null, true);
     return;
   }
@@ -54,7 +80,7 @@ const fileFilter = (_: Request, file: Express.Multer.File, cb: multer.FileFilter
   // If mimetype check fails, check file extension for HEIC/HEIF files
   // This handles cases where browsers don't set the correct mimetype for HEIC files
   const fileExtension = file.originalname.toLowerCase().split('.').pop();
-  if (fileExtension === 'heic' || fileExtension === 'heif') {
+  if (fileExtension && HEIC_EXTENSIONS.has(fileExtension)) {
     logger.debug('HEIC/HEIF file detected by extension, allowing upload', { 
       originalname: file.originalname,
       mimetype: file.mimetype 
@@ -64,9 +90,7 @@ const fileFilter = (_: Request, file: Express.Multer.File, cb: multer.FileFilter
   }
 
   // File type not allowed
-  const error = new Error(
-    `Invalid file type. Allowed types: ${config.allowedFileTypes.join(', ')}`
-  ) as Error & { code: string };
+  const error = new Error(INVALID_FILE_TYPE_MESSAGE) as Error & { code: string };
   error.code = 'INVALID_FILE_TYPE';
   cb(error as any, false);
 };
@@ -91,6 +115,45 @@ export const uploadMultipleMiddleware = multer({
   fileFilter,
 });
 
+// Allowance for boundaries, part headers and text fields on top of the file bytes
+const MULTIPART_OVERHEAD_BYTES = 1024 * 1024;
+
+// Reject uploads that are obviously invalid from the request headers alone, before any
+// body is read. Placed ahead of the generation queue and multer so an oversized request
+// doesn't wait for a slot or get streamed in only to fail the per-file size limit.
+export const rejectOversizedUpload = (maxFiles: number): RequestHandler => {
+  const maxContentLength = maxFiles * config.maxFileSize + MULTIPART_OVERHEAD_BYTES;
+
+  return (req: Request, res: Response, next: NextFunction): void => {
+    if (!req.is('multipart/form-data')) {
+      res.status(400).json({
+        success: false,
+        message: 'Expected a multipart/form-data upload',
+        error: 'INVALID_CONTENT_TYPE',
+      });
+      return;
+    }
+
+    // Chunked requests carry no Content-Length; multer's fileSize limit still applies to them
+    const contentLength = parseInt(req.headers['content-length'] || '', 10);
+    if (contentLength > maxContentLength) {
+      logger.warn('Rejecting oversized upload before reading body', {
+        path: req.path,
+        contentLength,
+        maxContentLength
+      });
+      res.status(413).json({
+        success: false,
+        message: `File too large. Maximum size is ${config.maxFileSize / (1024 * 1024)}MB`,
+        error: 'FILE_TOO_LARGE',
+      });
+      return;
+    }
+
+    next();
+  };
+};
+
 // Error handling middleware for multer
 export const handleUploadError = (
   error: Error,
@@ -148,6 +211,83 @@ export const handleUploadError = (
   });
 };
 
+// Validate an in-memory (R2 mode) upload with Sharp and detect HEIC/HEIF input.
+// Shared by the single and multiple file validators.
+const inspectBufferedImage = async (
+  file: Express.Multer.File
+): Promise<{ isValidImage: boolean; isHeic: boolean }> => {
+  try {
+    // Use Sharp to validate the buffer directly
+    const sharp = require('sharp');
+    const metadata = await sharp(file.buffer).metadata();
+    const isValidImage = !!(metadata.width && metadata.height);
+
+    // Check if it's HEIC format by examining the buffer and filename
+    const bufferStart = file.buffer.slice(0, 12);
+    const hasHeicSignature = HEIC_SIGNATURES.some(sig => bufferStart.includes(sig));
+
+    // Also check filename extension as fallback
+    const filename = file.originalname || '';
+    const hasHeicExtension = HEIC_FILENAME_PATTERN.test(filename);
+
+    // Also check MIME type as additional fallback
+    const hasHeicMimeType = file.mimetype === 'image/heic' || file.mimetype === 'image/heif';
+
+    const isHeic = hasHeicSignature || hasHeicExtension || hasHeicMimeType;
+
+    logger.info('HEIC detection completed', {
+      hasHeicSignature,
+      hasHeicExtension,
+      hasHeicMimeType,
+      filename,
+      mimetype: file.mimetype,
+      bufferStart: bufferStart.toString('hex'),
+      isHeic
+    });
+
+    logger.info('Memory validation completed', {
+      isValidImage,
+      isHeic,
+      width: metadata.width,
+      height: metadata.height,
+      format: metadata.format
+    });
+
+    return { isValidImage, isHeic };
+  } catch (bufferError) {
+    logger.error('Buffer validation failed', { error: bufferError });
+    return { isValidImage: false, isHeic: false };
+  }
+};
+
+// Convert an in-memory HEIC/HEIF upload to WebP in place (buffer, mimetype and name)
+const convertBufferedHeicToWebP = async (file: Express.Multer.File): Promise<void> => {
+  logger.info('HEIC file detected in memory, converting to WebP', {
+    originalSize: file.buffer.length,
+    isMemoryStorage: true
+  });
+
+  const originalSize = file.buffer.length;
+  const webpBuffer = await FileUtils.convertHeicBufferToWebP(file.buffer);
+
+  // Update the buffer with converted WebP data
+  file.buffer = webpBuffer;
+  file.mimetype = 'image/webp';
+
+  // Update filename to reflect WebP format
+  const originalName = file.originalname || 'converted_image';
+  const newOriginalName = originalName.replace(/\.[^.]+$/, '.webp');
+  file.originalname = newOriginalName;
+
+  logger.info('HEIC to WebP conversion successful in memory', {
+    originalName: originalName,
+    newOriginalName: newOriginalName,
+    originalSize,
+    newSize: webpBuffer.length,
+    newMimetype: file.mimetype
+  });
+};
+
 // Middleware to validate uploaded file
 export const validateUploadedFile = async (
   req: Request,
@@ -179,55 +319,10 @@ export const validateUploadedFile = async (
 
     if (req.file.buffer) {
       // Memory storage (R2 mode) - validate directly from buffer without temp files
-      try {
-        // Use Sharp to validate the buffer directly
-        const sharp = require('sharp');
-        const metadata = await sharp(req.file.buffer).metadata();
-        isValidImage = !!(metadata.width && metadata.height);
-        
-        // Check if it's HEIC format by examining the buffer and filename
-        const bufferStart = req.file.buffer.slice(0, 12);
-        const heicSignatures = [
-          Buffer.from([0x00, 0x00, 0x00, 0x20, 0x66, 0x74, 0x79, 0x70]), // HEIC
-          Buffer.from([0x00, 0x00, 0x00, 0x18, 0x66, 0x74, 0x79, 0x70]), // HEIF
-        ];
-        const hasHeicSignature = heicSignatures.some(sig => bufferStart.includes(sig));
-        
-        // Also check filename extension as fallback
-        const filename = req.file.originalname || '';
-        const hasHeicExtension = /\.(heic|heif)$/i.test(filename);
-        
-        // Also check MIME type as additional fallback
-        const hasHeicMimeType = req.file.mimetype === 'image/heic' || req.file.mimetype === 'image/heif';
-        
-        isHeic = hasHeicSignature || hasHeicExtension || hasHeicMimeType;
-        
-        logger.info('HEIC detection completed', {
-          hasHeicSignature,
-          hasHeicExtension,
-          hasHeicMimeType,
-          filename,
-          mimetype: req.file.mimetype,
-          bufferStart: bufferStart.toString('hex'),
-          isHeic
-        });
-        
-        logger.info('Memory validation completed', {
-          isValidImage,
-          isHeic,
-          width: metadata.width,
-          height: metadata.height,
-          format: metadata.format
-        });
-      } catch (bufferError) {
-        logger.error('Buffer validation failed', { error: bufferError });
-        isValidImage = false;
-        isHeic = false;
-      }
+      ({ isValidImage, isHeic } = await inspectBufferedImage(req.file));
     } else {
       // Disk storage (local mode) - use existing file-based validation
-      isValidImage = await FileUtils.validateImageFile(req.file.path);
-      isHeic = await FileUtils.isHeicFormat(req.file.path);
+      ({ isValidImage, isHeic } = await FileUtils.inspectImageFile(req.file.path));
     }
     
     if (!isValidImage) {
@@ -248,7 +343,7 @@ export const validateUploadedFile = async (
     
     // Force HEIC conversion if filename suggests HEIC (additional safety check)
     const filename = req.file.originalname || '';
-    const forceHeicConversion = /\.(heic|heif)$/i.test(filename);
+    const forceHeicConversion = HEIC_FILENAME_PATTERN.test(filename);
     
     if (isHeic || forceHeicConversion) {
       logger.info('HEIC file detected, starting conversion process', { 
@@ -259,92 +354,7 @@ export const validateUploadedFile = async (
       try {
         if (req.file.buffer) {
           // Memory storage - convert buffer directly
-          logger.info('HEIC file detected in memory, converting to WebP', { 
-            originalSize: req.file.buffer.length,
-            isMemoryStorage: true
-          });
-          
-          const sharp = require('sharp');
-          let webpBuffer: Buffer;
-          
-          try {
-            // Method 1: Try direct Sharp WebP conversion
-            webpBuffer = await sharp(req.file.buffer)
-              .webp({ 
-                quality: 95,           // Higher quality (90 → 95)
-                lossless: false,       // Better compression
-                effort: 6,            // Maximum compression effort (0-6)
-                smartSubsample: true   // Better color handling
-              })
-              .toBuffer();
-          } catch (sharpError) {
-            logger.warn('Sharp WebP conversion failed, trying JPEG fallback', { 
-              error: sharpError instanceof Error ? sharpError.message : String(sharpError)
-            });
-            
-            try {
-              // Method 2: Try HEIC → JPEG → WebP (more compatible)
-              const jpegBuffer = await sharp(req.file.buffer)
-                .jpeg({ quality: 95 })
-                .toBuffer();
-              
-              webpBuffer = await sharp(jpegBuffer)
-                .webp({ 
-                  quality: 95,           // Higher quality
-                  lossless: false,       // Better compression
-                  effort: 6,            // Maximum compression effort (0-6)
-                  smartSubsample: true   // Better color handling
-                })
-                .toBuffer();
-            } catch (jpegFallbackError) {
-              logger.warn('JPEG fallback conversion failed, trying heic-convert', { 
-                error: jpegFallbackError instanceof Error ? jpegFallbackError.message : String(jpegFallbackError)
-              });
-              
-              try {
-                // Method 3: Try heic-convert plugin
-                const heicConvert = require('heic-convert');
-                const jpegBuffer = await heicConvert({
-                  buffer: req.file.buffer,
-                  format: 'JPEG',
-                  quality: 0.95
-                });
-                
-                webpBuffer = await sharp(jpegBuffer)
-                  .webp({ 
-                    quality: 95,           // Higher quality
-                    lossless: false,       // Better compression
-                    effort: 6,            // Maximum compression effort (0-6)
-                    smartSubsample: true   // Better color handling
-                  })
-                  .toBuffer();
-              } catch (heicConvertError) {
-                logger.error('All HEIC conversion methods failed', { 
-                  sharpError: sharpError instanceof Error ? sharpError.message : String(sharpError),
-                  jpegFallbackError: jpegFallbackError instanceof Error ? jpegFallbackError.message : String(jpegFallbackError),
-                  heicConvertError: heicConvertError instanceof Error ? heicConvertError.message : String(heicConvertError)
-                });
-                throw new Error(`All HEIC conversion methods failed. Last error: ${heicConvertError instanceof Error ? heicConvertError.message : String(heicConvertError)}`);
-              }
-            }
-          }
-          
-          // Update the buffer with converted WebP data
-          req.file.buffer = webpBuffer;
-          req.file.mimetype = 'image/webp';
-          
-          // Update filename to reflect WebP format
-          const originalName = req.file.originalname || 'converted_image';
-          const newOriginalName = originalName.replace(/\.[^.]+$/, '.webp');
-          req.file.originalname = newOriginalName;
-          
-          logger.info('HEIC to WebP conversion successful in memory', { 
-            originalName: originalName,
-            newOriginalName: newOriginalName,
-            originalSize: req.file.buffer.length,
-            newSize: webpBuffer.length,
-            newMimetype: req.file.mimetype
-          });
+          await convertBufferedHeicToWebP(req.file);
         } else {
           // Disk storage - use existing file-based conversion
           const filePath = req.file.path;
@@ -519,55 +529,10 @@ export const validateUploadedFiles = async (
 
       if (file.buffer) {
         // Memory storage (R2 mode) - validate directly from buffer without temp files
-        try {
-          // Use Sharp to validate the buffer directly
-          const sharp = require('sharp');
-          const metadata = await sharp(file.buffer).metadata();
-          isValidImage = !!(metadata.width && metadata.height);
-          
-          // Check if it's HEIC format by examining the buffer and filename
-          const bufferStart = file.buffer.slice(0, 12);
-          const heicSignatures = [
-            Buffer.from([0x00, 0x00, 0x00, 0x20, 0x66, 0x74, 0x79, 0x70]), // HEIC
-            Buffer.from([0x00, 0x00, 0x00, 0x18, 0x66, 0x74, 0x79, 0x70]), // HEIF
-          ];
-          const hasHeicSignature = heicSignatures.some(sig => bufferStart.includes(sig));
-          
-          // Also check filename extension as fallback
-          const filename = file.originalname || '';
-          const hasHeicExtension = /\.(heic|heif)$/i.test(filename);
-          
-          // Also check MIME type as additional fallback
-          const hasHeicMimeType = file.mimetype === 'image/heic' || file.mimetype === 'image/heif';
-          
-          isHeic = hasHeicSignature || hasHeicExtension || hasHeicMimeType;
-          
-          logger.info('HEIC detection completed', {
-            hasHeicSignature,
-            hasHeicExtension,
-            hasHeicMimeType,
-            filename,
-            mimetype: file.mimetype,
-            bufferStart: bufferStart.toString('hex'),
-            isHeic
-          });
-          
-          logger.info('Memory validation completed', {
-            isValidImage,
-            isHeic,
-            width: metadata.width,
-            height: metadata.height,
-            format: metadata.format
-          });
-        } catch (bufferError) {
-          logger.error('Buffer validation failed', { error: bufferError });
-          isValidImage = false;
-          isHeic = false;
-        }
+        ({ isValidImage, isHeic } = await inspectBufferedImage(file));
       } else {
         // Disk storage (local mode) - use existing file-based validation
-        isValidImage = await FileUtils.validateImageFile(file.path);
-        isHeic = await FileUtils.isHeicFormat(file.path);
+        ({ isValidImage, isHeic } = await FileUtils.inspectImageFile(file.path));
       }
       
       if (!isValidImage) {
@@ -588,7 +553,7 @@ export const validateUploadedFiles = async (
       
       // Force HEIC conversion if filename suggests HEIC (additional safety check)
       const filename = file.originalname || '';
-      const forceHeicConversion = /\.(heic|heif)$/i.test(filename);
+      const forceHeicConversion = HEIC_FILENAME_PATTERN.test(filename);
       
       if (isHeic || forceHeicConversion) {
         logger.info('HEIC file detected, starting conversion process', { 
@@ -599,92 +564,7 @@ export const validateUploadedFiles = async (
         try {
           if (file.buffer) {
             // Memory storage - convert buffer directly
-            logger.info('HEIC file detected in memory, converting to WebP', { 
-              originalSize: file.buffer.length,
-              isMemoryStorage: true
-            });
-            
-            const sharp = require('sharp');
-            let webpBuffer: Buffer;
-            
-            try {
-              // Method 1: Try direct Sharp WebP conversion
-              webpBuffer = await sharp(file.buffer)
-                .webp({ 
-                  quality: 95,           // Higher quality (90 → 95)
-                  lossless: false,       // Better compression
-                  effort: 6,            // Maximum compression effort (0-6)
-                  smartSubsample: true   // Better color handling
-                })
-                .toBuffer();
-            } catch (sharpError) {
-              logger.warn('Sharp WebP conversion failed, trying JPEG fallback', { 
-                error: sharpError instanceof Error ? sharpError.message : String(sharpError)
-              });
-              
-              try {
-                // Method 2: Try HEIC → JPEG → WebP (more compatible)
-                const jpegBuffer = await sharp(file.buffer)
-                  .jpeg({ quality: 95 })
-                  .toBuffer();
-                
-                webpBuffer = await sharp(jpegBuffer)
-                  .webp({ 
-                    quality: 95,           // Higher quality
-                    lossless: false,       // Better compression
-                    effort: 6,            // Maximum compression effort (0-6)
-                    smartSubsample: true   // Better color handling
-                  })
-                  .toBuffer();
-              } catch (jpegFallbackError) {
-                logger.warn('JPEG fallback conversion failed, trying heic-convert', { 
-                  error: jpegFallbackError instanceof Error ? jpegFallbackError.message : String(jpegFallbackError)
-                });
-                
-                try {
-                  // Method 3: Try heic-convert plugin
-                  const heicConvert = require('heic-convert');
-                  const jpegBuffer = await heicConvert({
-                    buffer: file.buffer,
-                    format: 'JPEG',
-                    quality: 0.95
-                  });
-                  
-                  webpBuffer = await sharp(jpegBuffer)
-                    .webp({ 
-                      quality: 95,           // Higher quality
-                      lossless: false,       // Better compression
-                      effort: 6,            // Maximum compression effort (0-6)
-                      smartSubsample: true   // Better color handling
-                    })
-                    .toBuffer();
-                } catch (heicConvertError) {
-                  logger.error('All HEIC conversion methods failed', { 
-                    sharpError: sharpError instanceof Error ? sharpError.message : String(sharpError),
-                    jpegFallbackError: jpegFallbackError instanceof Error ? jpegFallbackError.message : String(jpegFallbackError),
-                    heicConvertError: heicConvertError instanceof Error ? heicConvertError.message : String(heicConvertError)
-                  });
-                  throw new Error(`All HEIC conversion methods failed. Last error: ${heicConvertError instanceof Error ? heicConvertError.message : String(heicConvertError)}`);
-                }
-              }
-            }
-            
-            // Update the buffer with converted WebP data
-            file.buffer = webpBuffer;
-            file.mimetype = 'image/webp';
-            
-            // Update filename to reflect WebP format
-            const originalName = file.originalname || 'converted_image';
-            const newOriginalName = originalName.replace(/\.[^.]+$/, '.webp');
-            file.originalname = newOriginalName;
-            
-            logger.info('HEIC to WebP conversion successful in memory', { 
-              originalName: originalName,
-              newOriginalName: newOriginalName,
-              originalSize: file.buffer.length,
-              newSize: webpBuffer.length,
-              newMimetype: file.mimetype
-            });
+            await convertBufferedHeicToWebP(file);
           } else {
             // Disk storage - use existing file-based conversion
             const filePath = file.path;
@@ -699,12 +579,7 @@ export const validateUploadedFiles = async (
               const outputPath = filePath.replace(/\.[^.]+$/, '.webp');
               
               await sharp(filePath)
-                .webp({ 
-                  quality: 95,           // Higher quality (90 → 95)
-                  lossless: false,       // Better compression
-                  effort: 6,            // Maximum compression effort (0-6)
-                  smartSubsample: true   // Better color handling
-                })
+                .webp(WEBP_OPTIONS)
                 .toFile(outputPath);
               
               // Update file info
@@ -5,11 +5,13 @@ import {
   uploadMiddleware,
   uploadMultipleMiddleware,
   handleUploadError,
+  rejectOversizedUpload,
   validateUploadedFile,
   validateUploadedFiles,
 } from '../middleware/uploadMiddleware';
 import { asyncHandler } from '../middleware/errorHandler';
 import { authenticateToken, checkGenerationLimit, checkModelAccess } from '../middleware/authMiddleware';
+import { limitConcurrency, holdGenerationSlot } from '../middleware/concurrencyMiddleware';
 import { config } from '../config';
 import conversionEventService, {
   ConversionEventPayload,
@@ -42,6 +44,14 @@ const createRateLimit = (windowMs: number, max: number): ReturnType<typeof rateL
 // General rate limit
 const generalRateLimit = createRateLimit(config.rateLimitWindowMs, config.rateLimitMaxRequests);
 
+// Shared queue for AI generation endpoints; placed before multer so queued uploads are not buffered
+const generationQueue = limitConcurrency(config.maxConcurrentGenerations, config.maxQueuedGenerations);
+
+// Header-only upload checks, sized to how many files each route accepts
+const singleUploadCheck = rejectOversizedUpload(1);
+const pairUploadCheck = rejectOversizedUpload(2);
+const batchUploadCheck = rejectOversizedUpload(21);
+
 const isValidEventType = (value: unknown): value is ConversionEventType =>
   value === 'Lead' || value === 'CompleteRegistration';
 
@@ -190,6 +200,7 @@ router.get('/recommendations', generalRateLimit, asyncHandler(imageController.ge
 // File upload endpoint (for testing)
 router.post('/upload', 
   generalRateLimit,
+  singleUploadCheck,
   uploadMiddleware.single('image'),
   handleUploadError,
   validateUploadedFile,
@@ -201,10 +212,12 @@ router.post('/process-image',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('interior_design'),
+  singleUploadCheck,
+  generationQueue,
   uploadMiddleware.single('image'),
   handleUploadError,
   validateUploadedFile,
-  asyncHandler(imageController.processImage)
+  asyncHandler(holdGenerationSlot(imageController.processImage))
 );
 
 // Interior design processing endpoint
@@ -212,10 +225,12 @@ router.post('/interior-design',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('interior_design'),
+  singleUploadCheck,
+  generationQueue,
   uploadMiddleware.single('image'),
   handleUploadError,
   validateUploadedFile,
-  asyncHandler(imageController.processImageWithInteriorDesign)
+  asyncHandler(holdGenerationSlot(imageController.processImageWithInteriorDesign))
 );
 
 // Image enhancement endpoint
@@ -228,13 +243,15 @@ router.post('/image-enhancement',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('image_enhancement'),
+  batchUploadCheck,
+  generationQueue,
   uploadMultipleMiddleware.fields([
     { name: 'image', maxCount: 20 },
     { name: 'referenceImage', maxCount: 1 }
   ]),
   validateUploadedFiles,
   handleUploadError,
-  asyncHandler(imageController.enhanceImage)
+  asyncHandler(holdGenerationSlot(imageController.enhanceImage))
 );
 
 // Element replacement endpoint
@@ -242,12 +259,14 @@ router.post('/replace-elements',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('element_replacement'),
+  singleUploadCheck,
+  generationQueue,
   uploadMultipleMiddleware.fields([
     { name: 'image', maxCount: 1 }
   ]),
   validateUploadedFiles,
   handleUploadError,
-  asyncHandler(imageController.replaceElements)
+  asyncHandler(holdGenerationSlot(imageController.replaceElements))
 );
 
 // Add furnitures endpoint
@@ -255,13 +274,15 @@ router.post('/add-furnitures',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('add_furnitures'),
+  pairUploadCheck,
+  generationQueue,
   uploadMultipleMiddleware.fields([
     { name: 'roomImage', maxCount: 1 },
     { name: 'furnitureImage', maxCount: 1 }
   ]),
   validateUploadedFiles,
   handleUploadError,
-  asyncHandler(imageController.addFurnitures)
+  asyncHandler(holdGenerationSlot(imageController.addFurnitures))
 );
 
 // Exterior design endpoint
@@ -269,10 +290,12 @@ router.post('/exterior-design',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('exterior_design'),
+  singleUploadCheck,
+  generationQueue,
   uploadMiddleware.single('buildingImage'),
   validateUploadedFile,
   handleUploadError,
-  asyncHandler(imageController.exteriorDesign)
+  asyncHandler(holdGenerationSlot(imageController.exteriorDesign))
 );
 
 // Smart effects endpoint
@@ -280,10 +303,12 @@ router.post('/smart-effects',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('smart_effects'),
+  singleUploadCheck,
+  generationQueue,
   uploadMiddleware.single('houseImage'),
   validateUploadedFile,
   handleUploadError,
-  asyncHandler(imageController.smartEffects)
+  asyncHandler(holdGenerationSlot(imageController.smartEffects))
 );
 
 // Video motion generation endpoint
@@ -291,11 +316,13 @@ router.post('/generate-video-motion',
   authenticateToken,
   checkGenerationLimit,
   checkModelAccess('video_generation'),
-  asyncHandler(imageController.generateVideoMotion)
+  generationQueue,
+  asyncHandler(holdGenerationSlot(imageController.generateVideoMotion))
 );
 
 // HEIC conversion endpoint for preview
 router.post('/convert-heic', 
+  singleUploadCheck,
   uploadMiddleware.single('image'),
   handleUploadError,
   asyncHandler(imageController.convertHeic)
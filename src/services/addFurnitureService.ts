@@ -35,40 +35,50 @@ export class AddFurnitureService {
    * ⚠️ CRITICAL: Parameters are fixed and tested - DO NOT CHANGE
    */
   public async addFurniture(
-    roomImagePath: string,
-    furnitureImagePath: string | null = null,
+    roomImagePath: string | Buffer,
+    furnitureImagePath: string | Buffer | null = null,
     prompt: string,
     furnitureType: string = 'general'
   ): Promise<{ outputUrl: string; metadata: any }> {
     const startTime = Date.now();
     const requestId = uuidv4();
+    const roomImageLabel = FileUtils.describeImageInput(roomImagePath);
+    const furnitureImageLabel = FileUtils.describeImageInput(furnitureImagePath);
 
     try {
       logger.info('🪑 Starting furniture addition', {
         requestId,
-        roomImagePath,
-        furnitureImagePath,
+        roomImagePath: roomImageLabel,
+        furnitureImagePath: furnitureImageLabel,
         prompt,
         furnitureType,
         model: this.modelId
       });
 
-      // Validate room image file exists
-      const fs = require('fs');
-      if (!fs.existsSync(roomImagePath)) {
-        throw new Error(`Room image file not found: ${roomImagePath}`);
+      if (Buffer.isBuffer(roomImagePath)) {
+        // In-memory upload (R2 mode) - nothing to stat
+        logger.info('📁 Room image buffer details', {
+          requestId,
+          fileSize: roomImagePath.length,
+          isBuffer: true
+        });
+      } else {
+        // Validate room image file exists
+        const roomImageStats = await FileUtils.statIfExists(roomImagePath);
+        if (!roomImageStats) {
+          throw new Error(`Room image file not found: ${roomImagePath}`);
+        }
+        
+        logger.info('📁 Room image file details', {
+          requestId,
+          fileSize: roomImageStats.size,
+          fileExists: true,
+          roomImagePath
+        });
       }
-      
-      const roomImageStats = fs.statSync(roomImagePath);
-      logger.info('📁 Room image file details', {
-        requestId,
-        fileSize: roomImageStats.size,
-        fileExists: true,
-        roomImagePath
-      });
 
       // Validate furniture image file if provided
-      if (furnitureImagePath && !fs.existsSync(furnitureImagePath)) {
+      if (typeof furnitureImagePath === 'string' && !(await FileUtils.statIfExists(furnitureImagePath))) {
         throw new Error(`Furniture image file not found: ${furnitureImagePath}`);
       }
 
@@ -166,8 +176,8 @@ export class AddFurnitureService {
         logger.error('❌ Base64 conversion failed', {
           requestId,
           error: base64Error instanceof Error ? base64Error.message : String(base64Error),
-          roomImagePath,
-          furnitureImagePath
+          roomImagePath: roomImageLabel,
+          furnitureImagePath: furnitureImageLabel
         });
         throw new Error(`Image conversion failed: ${base64Error instanceof Error ? base64Error.message : String(base64Error)}`);
       }
@@ -181,8 +191,8 @@ export class AddFurnitureService {
         errorStack: error instanceof Error ? error.stack : undefined,
         processingTime,
         model: this.modelId,
-        roomImagePath,
-        furnitureImagePath
+        roomImagePath: roomImageLabel,
+        furnitureImagePath: furnitureImageLabel
       });
 
       throw error;
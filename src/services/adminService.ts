@@ -49,6 +49,19 @@ export interface GenerationStats {
 }
 
 export class AdminService {
+  private stripeClient?: Stripe;
+
+  /**
+   * Stripe client used for plan-change verification, created on first use and reused
+   */
+  private getStripeClient(): Stripe {
+    if (!this.stripeClient) {
+      const { getStripeSecretKey } = require('../utils/stripeConfig');
+      this.stripeClient = new Stripe(getStripeSecretKey(), { apiVersion: '2023-10-16' });
+    }
+    return this.stripeClient;
+  }
+
   /**
    * Get all users (admin only)
    * Includes monthly credits used calculation
@@ -394,8 +407,7 @@ export class AdminService {
           }
         } else {
           // Normal flow: require Stripe verification
-          const { getStripeSecretKey } = require('../utils/stripeConfig');
-          const stripe = new Stripe(getStripeSecretKey(), { apiVersion: '2023-10-16' });
+          const stripe = this.getStripeClient();
           const expectedAmount = newPlan === 'explorer' ? 27 : 47;
 
           // Helper: find latest paid checkout session for this user by email or customer id
@@ -1,6 +1,7 @@
 import Replicate from 'replicate';
 import { config } from '../config';
 import { logger } from '../utils/logger';
+import { FileUtils } from '../utils/fileUtils';
 import { v4 as uuidv4 } from 'uuid';
 
 export class ElementReplacementService {
@@ -47,8 +48,7 @@ export class ElementReplacementService {
         });
       } else {
         // Input is a file path - validate it exists first
-        const fs = require('fs');
-        if (!fs.existsSync(imagePath)) {
+        if (!(await FileUtils.statIfExists(imagePath))) {
           throw new Error(`Input image file not found: ${imagePath}`);
         }
         
@@ -59,7 +59,7 @@ export class ElementReplacementService {
         });
         
         // Read file into buffer
-        imageBuffer = fs.readFileSync(imagePath);
+        imageBuffer = await FileUtils.readFileAsBuffer(imagePath);
       }
       
       // Convert image to base64 for Replicate API
@@ -1,8 +1,39 @@
 import Replicate from 'replicate';
 import { config } from '../config';
 import { logger } from '../utils/logger';
+import { FileUtils } from '../utils/fileUtils';
 import { v4 as uuidv4 } from 'uuid';
 
+// Prompt fragments resolved from the environment once at module load rather than per request
+const EXTERIOR_STYLE_PREFIXES: Record<string, string> = {
+  isometric: process.env.PROMPT_EXTERIOR_STYLE_ISOMETRIC_PREFIX || 'Create an isometric architectural view of ',
+  realistic: process.env.PROMPT_EXTERIOR_STYLE_REALISTIC_PREFIX || 'Create a photorealistic exterior design of ',
+  architectural: process.env.PROMPT_EXTERIOR_STYLE_ARCHITECTURAL_PREFIX || 'Create an architectural exterior visualization of '
+};
+
+const EXTERIOR_STYLE_DEFAULT_PREFIX = process.env.PROMPT_EXTERIOR_STYLE_DEFAULT_PREFIX || 'Create an exterior design of ';
+
+const EXTERIOR_STYLE_SUFFIXES: Record<string, string> = {
+  isometric: process.env.PROMPT_EXTERIOR_STYLE_ISOMETRIC_SUFFIX || '. Show clean geometric lines and technical drawing style',
+  realistic: process.env.PROMPT_EXTERIOR_STYLE_REALISTIC_SUFFIX || '. Include realistic lighting, shadows, and materials',
+  architectural: process.env.PROMPT_EXTERIOR_STYLE_ARCHITECTURAL_SUFFIX || '. Focus on structural elements and building form'
+};
+
+const EXTERIOR_DESIGN_TYPE_ENHANCEMENTS: Record<string, string> = {
+  modern: process.env.PROMPT_EXTERIOR_TYPE_MODERN || '. Modern contemporary style with clean lines, large windows, and minimalist facade',
+  traditional: process.env.PROMPT_EXTERIOR_TYPE_TRADITIONAL || '. Traditional architectural style with classical elements and detailed facade',
+  minimalist: process.env.PROMPT_EXTERIOR_TYPE_MINIMALIST || '. Minimalist design with simple forms, neutral colors, and clean surfaces',
+  industrial: process.env.PROMPT_EXTERIOR_TYPE_INDUSTRIAL || '. Industrial style with exposed materials, metal elements, and urban aesthetic'
+};
+
+// CRITICAL: Preservation instructions that keep the original building structure intact
+const EXTERIOR_PRESERVATION_INSTRUCTIONS = process.env.PROMPT_EXTERIOR_PRESERVATION ||
+  ' PRESERVE the exact original building structure, shape, size, dimensions, roof lines, window positions, door locations, and overall architectural layout. ' +
+  'ONLY modify exterior materials, colors, textures, finishes, and design elements. ' +
+  'Maintain the same camera angle, perspective, and building footprint. ' +
+  'Keep all structural elements (walls, roof shape, foundation) identical to the original. ' +
+  'Apply the design transformation while keeping the building structure completely unchanged.';
+
 export class ExteriorDesignService {
   private replicate: Replicate;
   private readonly modelId = 'google/nano-banana:1b7b945e8f7edf7a034eba6cb2c20f2ab5dc7d090eea1c616e96da947be76aee';
@@ -15,6 +46,8 @@ export class ExteriorDesignService {
 
   /**
    * Generate exterior design using google/nano-banana model
+   * Callers that already built the prompt with generateExteriorPrompt can pass it as
+   * prebuiltPrompt so it is not rebuilt here.
    * 
    * ⚠️ CRITICAL: Parameters are fixed and tested - DO NOT CHANGE
    */
@@ -22,7 +55,8 @@ export class ExteriorDesignService {
     buildingImagePath: string | Buffer,
     designPrompt: string,
     designType: 'modern' | 'traditional' | 'minimalist' | 'industrial' | 'custom' = 'modern',
-    style: 'isometric' | 'realistic' | 'architectural' = 'architectural'
+    style: 'isometric' | 'realistic' | 'architectural' = 'architectural',
+    prebuiltPrompt?: string
   ): Promise<{ outputUrl: string; metadata: any }> {
     const startTime = Date.now();
     const requestId = uuidv4();
@@ -52,12 +86,11 @@ export class ExteriorDesignService {
         });
       } else {
         // Input is a file path
-        const fs = require('fs');
-        if (!fs.existsSync(buildingImagePath)) {
+        const buildingImageStats = await FileUtils.statIfExists(buildingImagePath);
+        if (!buildingImageStats) {
           throw new Error(`Building image file not found: ${buildingImagePath}`);
         }
         
-        const buildingImageStats = fs.statSync(buildingImagePath);
         fileSize = buildingImageStats.size;
         logger.info('📁 Building image file details', {
           requestId,
@@ -67,7 +100,7 @@ export class ExteriorDesignService {
         });
         
         // Read file into buffer
-        buildingImageBuffer = fs.readFileSync(buildingImagePath);
+        buildingImageBuffer = await FileUtils.readFileAsBuffer(buildingImagePath);
       }
 
       // Convert image to base64
@@ -81,7 +114,7 @@ export class ExteriorDesignService {
         });
 
         // Generate design-specific prompt based on type and style
-        const enhancedPrompt = this.generateExteriorPrompt(designPrompt, designType, style);
+        const enhancedPrompt = prebuiltPrompt ?? this.generateExteriorPrompt(designPrompt, designType, style);
         
         const input = {
           prompt: enhancedPrompt,
@@ -169,43 +202,14 @@ export class ExteriorDesignService {
     designType: string,
     style: string
   ): string {
-    // Style-specific prefixes from environment variables
-    const stylePrefixes: Record<string, string> = {
-      isometric: process.env.PROMPT_EXTERIOR_STYLE_ISOMETRIC_PREFIX || 'Create an isometric architectural view of ',
-      realistic: process.env.PROMPT_EXTERIOR_STYLE_REALISTIC_PREFIX || 'Create a photorealistic exterior design of ',
-      architectural: process.env.PROMPT_EXTERIOR_STYLE_ARCHITECTURAL_PREFIX || 'Create an architectural exterior visualization of '
-    };
-
-    const styleSuffixes: Record<string, string> = {
-      isometric: process.env.PROMPT_EXTERIOR_STYLE_ISOMETRIC_SUFFIX || '. Show clean geometric lines and technical drawing style',
-      realistic: process.env.PROMPT_EXTERIOR_STYLE_REALISTIC_SUFFIX || '. Include realistic lighting, shadows, and materials',
-      architectural: process.env.PROMPT_EXTERIOR_STYLE_ARCHITECTURAL_SUFFIX || '. Focus on structural elements and building form'
-    };
-
-    let stylePrefix = stylePrefixes[style] || process.env.PROMPT_EXTERIOR_STYLE_DEFAULT_PREFIX || 'Create an exterior design of ';
-    let designSuffix = styleSuffixes[style] || '';
-
-    // Design type-specific enhancements from environment variables
-    const designTypeEnhancements: Record<string, string> = {
-      modern: process.env.PROMPT_EXTERIOR_TYPE_MODERN || '. Modern contemporary style with clean lines, large windows, and minimalist facade',
-      traditional: process.env.PROMPT_EXTERIOR_TYPE_TRADITIONAL || '. Traditional architectural style with classical elements and detailed facade',
-      minimalist: process.env.PROMPT_EXTERIOR_TYPE_MINIMALIST || '. Minimalist design with simple forms, neutral colors, and clean surfaces',
-      industrial: process.env.PROMPT_EXTERIOR_TYPE_INDUSTRIAL || '. Industrial style with exposed materials, metal elements, and urban aesthetic'
-    };
-
-    if (designType !== 'custom' && designTypeEnhancements[designType]) {
-      designSuffix += designTypeEnhancements[designType];
-    }
+    const stylePrefix = EXTERIOR_STYLE_PREFIXES[style] || EXTERIOR_STYLE_DEFAULT_PREFIX;
+    let designSuffix = EXTERIOR_STYLE_SUFFIXES[style] || '';
 
-    // CRITICAL: Add preservation instructions to maintain original building structure
-    const preservationInstructions = process.env.PROMPT_EXTERIOR_PRESERVATION || 
-      ' PRESERVE the exact original building structure, shape, size, dimensions, roof lines, window positions, door locations, and overall architectural layout. ' +
-      'ONLY modify exterior materials, colors, textures, finishes, and design elements. ' +
-      'Maintain the same camera angle, perspective, and building footprint. ' +
-      'Keep all structural elements (walls, roof shape, foundation) identical to the original. ' +
-      'Apply the design transformation while keeping the building structure completely unchanged.';
+    if (designType !== 'custom' && EXTERIOR_DESIGN_TYPE_ENHANCEMENTS[designType]) {
+      designSuffix += EXTERIOR_DESIGN_TYPE_ENHANCEMENTS[designType];
+    }
 
-    return `${stylePrefix}${originalPrompt}${designSuffix}. Transform the existing building with this exterior design concept.${preservationInstructions}`;
+    return `${stylePrefix}${originalPrompt}${designSuffix}. Transform the existing building with this exterior design concept.${EXTERIOR_PRESERVATION_INSTRUCTIONS}`;
   }
 
   /**
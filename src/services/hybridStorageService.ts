@@ -1,4 +1,4 @@
-import { R2Service, R2Config } from './r2Service';
+import type { R2Service, R2Config } from './r2Service';
 import { config } from '../config';
 import { logger } from '../utils/logger';
 import { FileUtils } from '../utils/fileUtils';
@@ -29,7 +29,9 @@ export class HybridStorageService {
         publicUrl: config.r2PublicUrl,
       };
       
-      this.r2Service = new R2Service(r2Config);
+      // Required lazily so local-storage deployments never load the AWS S3 SDK
+      const { R2Service: R2ServiceImpl } = require('./r2Service') as typeof import('./r2Service');
+      this.r2Service = new R2ServiceImpl(r2Config);
     } else {
       logger.error('HybridStorageService initialized with local storage only');
     }
@@ -311,3 +313,6 @@ export class HybridStorageService {
     return contentTypes[ext] || 'application/octet-stream';
   }
 }
+
+// Shared instance: one R2/S3 client (and its connection pool) per process instead of one per consumer
+export const hybridStorageService = new HybridStorageService();
@@ -1,6 +1,7 @@
 import Replicate from 'replicate';
 import { config } from '../config';
 import { logger } from '../utils/logger';
+import { FileUtils } from '../utils/fileUtils';
 import { v4 as uuidv4 } from 'uuid';
 
 export class ImageEnhancementService {
@@ -50,8 +51,7 @@ export class ImageEnhancementService {
         });
       } else {
         // Input is a file path
-        const fs = require('fs');
-        if (!fs.existsSync(imagePath)) {
+        if (!(await FileUtils.statIfExists(imagePath))) {
           throw new Error(`Input image file not found: ${imagePath}`);
         }
         
@@ -62,7 +62,7 @@ export class ImageEnhancementService {
         });
         
         // Read file into buffer
-        imageBuffer = fs.readFileSync(imagePath);
+        imageBuffer = await FileUtils.readFileAsBuffer(imagePath);
       }
       
       // Convert image to base64
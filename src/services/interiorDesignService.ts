@@ -5,6 +5,30 @@ import { FileUtils } from '../utils/fileUtils';
 import { v4 as uuidv4 } from 'uuid';
 import path from 'path';
 
+// Prompt fragments resolved from the environment once at module load rather than per request
+const INTERIOR_STYLE_PREFIXES: Record<string, string> = {
+  realistic: process.env.PROMPT_INTERIOR_STYLE_REALISTIC_PREFIX || 'Create a photorealistic interior design of ',
+  architectural: process.env.PROMPT_INTERIOR_STYLE_ARCHITECTURAL_PREFIX || 'Create an architectural interior visualization of ',
+  lifestyle: process.env.PROMPT_INTERIOR_STYLE_LIFESTYLE_PREFIX || 'Create a lifestyle interior design of '
+};
+
+const INTERIOR_STYLE_DEFAULT_PREFIX = process.env.PROMPT_INTERIOR_STYLE_DEFAULT_PREFIX || 'Create an interior design of ';
+
+const INTERIOR_STYLE_SUFFIXES: Record<string, string> = {
+  realistic: process.env.PROMPT_INTERIOR_STYLE_REALISTIC_SUFFIX || '. Include realistic lighting, shadows, textures, and materials',
+  architectural: process.env.PROMPT_INTERIOR_STYLE_ARCHITECTURAL_SUFFIX || '. Focus on structural elements, spatial design, and architectural details',
+  lifestyle: process.env.PROMPT_INTERIOR_STYLE_LIFESTYLE_SUFFIX || '. Show the space as lived-in with warm, inviting atmosphere'
+};
+
+const INTERIOR_DESIGN_TYPE_ENHANCEMENTS: Record<string, string> = {
+  modern: process.env.PROMPT_INTERIOR_TYPE_MODERN || '. Modern contemporary style with clean lines, neutral colors, and minimalist furniture',
+  traditional: process.env.PROMPT_INTERIOR_TYPE_TRADITIONAL || '. Traditional style with classic furniture, rich textures, and warm color palette',
+  minimalist: process.env.PROMPT_INTERIOR_TYPE_MINIMALIST || '. Minimalist design with simple forms, neutral colors, and uncluttered spaces',
+  scandinavian: process.env.PROMPT_INTERIOR_TYPE_SCANDINAVIAN || '. Scandinavian style with light woods, white walls, cozy textiles, and hygge elements',
+  industrial: process.env.PROMPT_INTERIOR_TYPE_INDUSTRIAL || '. Industrial style with exposed brick, metal elements, concrete surfaces, and urban aesthetic',
+  bohemian: process.env.PROMPT_INTERIOR_TYPE_BOHEMIAN || '. Bohemian style with eclectic furniture, vibrant colors, patterns, and artistic elements'
+};
+
 export class InteriorDesignService {
   private replicate: Replicate;
   private readonly modelId = 'google/nano-banana:1b7b945e8f7edf7a034eba6cb2c20f2ab5dc7d090eea1c616e96da947be76aee';
@@ -17,50 +41,64 @@ export class InteriorDesignService {
 
   /**
    * Generate interior design using google/nano-banana model
+   * Callers that already built the prompt with generateInteriorPrompt can pass it as
+   * prebuiltPrompt so it is not rebuilt here.
    * 
    * ⚠️ CRITICAL: Parameters are fixed and tested - DO NOT CHANGE
    */
   public async generateInteriorDesign(
-    roomImagePath: string,
+    roomImagePath: string | Buffer,
     designPrompt: string,
     designType: 'modern' | 'traditional' | 'minimalist' | 'scandinavian' | 'industrial' | 'bohemian' | 'custom' = 'modern',
-    style: 'realistic' | 'architectural' | 'lifestyle' = 'realistic'
+    style: 'realistic' | 'architectural' | 'lifestyle' = 'realistic',
+    prebuiltPrompt?: string
   ): Promise<{ outputUrl: string; metadata: any }> {
     const requestId = uuidv4();
     const startTime = Date.now();
+    const roomImageLabel = FileUtils.describeImageInput(roomImagePath);
 
     try {
       logger.info('🏠 Starting interior design generation', {
         requestId,
-        roomImagePath,
+        roomImagePath: roomImageLabel,
         designPrompt,
         designType,
         style,
         model: this.modelId
       });
 
-      // Validate room image file exists
-      const fs = require('fs');
-      if (!fs.existsSync(roomImagePath)) {
-        throw new Error(`Room image file not found: ${roomImagePath}`);
-      }
-      
-      const roomImageStats = fs.statSync(roomImagePath);
-      logger.info('📁 Room image file details', {
-        requestId,
-        fileSize: roomImageStats.size,
-        fileExists: true,
-        roomImagePath
-      });
+      let fileExtension = '';
+      let isHeic = false;
+      if (Buffer.isBuffer(roomImagePath)) {
+        // In-memory input (already resized/converted by the controller) - nothing to stat
+        logger.info('📁 Room image buffer details', {
+          requestId,
+          fileSize: roomImagePath.length,
+          isBuffer: true
+        });
+      } else {
+        // Validate room image file exists
+        const roomImageStats = await FileUtils.statIfExists(roomImagePath);
+        if (!roomImageStats) {
+          throw new Error(`Room image file not found: ${roomImagePath}`);
+        }
+        
+        logger.info('📁 Room image file details', {
+          requestId,
+          fileSize: roomImageStats.size,
+          fileExists: true,
+          roomImagePath
+        });
 
-      // Check if file is HEIC and provide better error handling
-      const fileExtension = path.extname(roomImagePath).toLowerCase();
-      const isHeic = fileExtension === '.heic' || fileExtension === '.heif';
+        // Check if file is HEIC and provide better error handling
+        fileExtension = path.extname(roomImagePath).toLowerCase();
+        isHeic = fileExtension === '.heic' || fileExtension === '.heif';
+      }
       
       if (isHeic) {
         logger.warn('⚠️ HEIC file detected - this may cause processing issues', {
           requestId,
-          roomImagePath,
+          roomImagePath: roomImageLabel,
           fileExtension
         });
         
@@ -89,7 +127,7 @@ export class InteriorDesignService {
         });
 
         // Generate design-specific prompt based on type and style
-        const enhancedPrompt = this.generateInteriorPrompt(designPrompt, designType, style);
+        const enhancedPrompt = prebuiltPrompt ?? this.generateInteriorPrompt(designPrompt, designType, style);
         
         const input = {
           prompt: enhancedPrompt,
@@ -144,7 +182,7 @@ export class InteriorDesignService {
         logger.error('❌ Base64 conversion failed', {
           requestId,
           error: base64Error instanceof Error ? base64Error.message : String(base64Error),
-          roomImagePath
+          roomImagePath: roomImageLabel
         });
         throw new Error(`Image conversion failed: ${base64Error instanceof Error ? base64Error.message : String(base64Error)}`);
       }
@@ -158,7 +196,7 @@ export class InteriorDesignService {
         errorStack: error instanceof Error ? error.stack : undefined,
         processingTime,
         model: this.modelId,
-        roomImagePath,
+        roomImagePath: roomImageLabel,
         designPrompt,
         designType,
         style
@@ -176,34 +214,11 @@ export class InteriorDesignService {
     designType: string,
     style: string
   ): string {
-    // Style-specific prefixes from environment variables
-    const stylePrefixes: Record<string, string> = {
-      realistic: process.env.PROMPT_INTERIOR_STYLE_REALISTIC_PREFIX || 'Create a photorealistic interior design of ',
-      architectural: process.env.PROMPT_INTERIOR_STYLE_ARCHITECTURAL_PREFIX || 'Create an architectural interior visualization of ',
-      lifestyle: process.env.PROMPT_INTERIOR_STYLE_LIFESTYLE_PREFIX || 'Create a lifestyle interior design of '
-    };
-
-    const styleSuffixes: Record<string, string> = {
-      realistic: process.env.PROMPT_INTERIOR_STYLE_REALISTIC_SUFFIX || '. Include realistic lighting, shadows, textures, and materials',
-      architectural: process.env.PROMPT_INTERIOR_STYLE_ARCHITECTURAL_SUFFIX || '. Focus on structural elements, spatial design, and architectural details',
-      lifestyle: process.env.PROMPT_INTERIOR_STYLE_LIFESTYLE_SUFFIX || '. Show the space as lived-in with warm, inviting atmosphere'
-    };
-
-    let stylePrefix = stylePrefixes[style] || process.env.PROMPT_INTERIOR_STYLE_DEFAULT_PREFIX || 'Create an interior design of ';
-    let designSuffix = styleSuffixes[style] || '';
-
-    // Design type-specific enhancements from environment variables
-    const designTypeEnhancements: Record<string, string> = {
-      modern: process.env.PROMPT_INTERIOR_TYPE_MODERN || '. Modern contemporary style with clean lines, neutral colors, and minimalist furniture',
-      traditional: process.env.PROMPT_INTERIOR_TYPE_TRADITIONAL || '. Traditional style with classic furniture, rich textures, and warm color palette',
-      minimalist: process.env.PROMPT_INTERIOR_TYPE_MINIMALIST || '. Minimalist design with simple forms, neutral colors, and uncluttered spaces',
-      scandinavian: process.env.PROMPT_INTERIOR_TYPE_SCANDINAVIAN || '. Scandinavian style with light woods, white walls, cozy textiles, and hygge elements',
-      industrial: process.env.PROMPT_INTERIOR_TYPE_INDUSTRIAL || '. Industrial style with exposed brick, metal elements, concrete surfaces, and urban aesthetic',
-      bohemian: process.env.PROMPT_INTERIOR_TYPE_BOHEMIAN || '. Bohemian style with eclectic furniture, vibrant colors, patterns, and artistic elements'
-    };
-
-    if (designType !== 'custom' && designTypeEnhancements[designType]) {
-      designSuffix += designTypeEnhancements[designType];
+    const stylePrefix = INTERIOR_STYLE_PREFIXES[style] || INTERIOR_STYLE_DEFAULT_PREFIX;
+    let designSuffix = INTERIOR_STYLE_SUFFIXES[style] || '';
+
+    if (designType !== 'custom' && INTERIOR_DESIGN_TYPE_ENHANCEMENTS[designType]) {
+      designSuffix += INTERIOR_DESIGN_TYPE_ENHANCEMENTS[designType];
     }
 
     return `${stylePrefix}${originalPrompt}${designSuffix}. Transform the existing room with this interior design concept.`;
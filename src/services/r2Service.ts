@@ -2,7 +2,8 @@ import { S3Client, PutObjectCommand, GetObjectCommand, DeleteObjectCommand, Head
 import { getSignedUrl } from '@aws-sdk/s3-request-presigner';
 import { logger } from '../utils/logger';
 import { Readable } from 'stream';
-import { promises as fs } from 'fs';
+import { pipeline } from 'stream/promises';
+import { promises as fs, createWriteStream } from 'fs';
 import path from 'path';
 
 export interface R2UploadResult {
@@ -179,6 +180,7 @@ export class R2Service {
    * Download a file from R2
    */
   public async downloadFile(key: string, outputPath: string): Promise<void> {
+    let writeStarted = false;
     try {
       logger.info('Starting R2 download', { key, outputPath });
 
@@ -193,29 +195,26 @@ export class R2Service {
         throw new Error('No body returned from R2');
       }
 
-      // Convert stream to buffer
-      const chunks: Uint8Array[] = [];
-      const stream = result.Body as Readable;
-      
-      for await (const chunk of stream) {
-        chunks.push(chunk);
-      }
-      
-      const buffer = Buffer.concat(chunks);
-      
       // Ensure output directory exists
       await fs.mkdir(path.dirname(outputPath), { recursive: true });
       
-      // Write file
-      await fs.writeFile(outputPath, buffer);
+      // Stream the body straight to disk instead of collecting every chunk into one
+      // Buffer first, so peak memory stays at a chunk rather than the whole object
+      const writeStream = createWriteStream(outputPath);
+      writeStarted = true;
+      await pipeline(result.Body as Readable, writeStream);
       
       logger.info('R2 download completed', {
         key,
         outputPath,
-        size: buffer.length,
+        size: writeStream.bytesWritten,
       });
 
     } catch (error) {
+      if (writeStarted) {
+        // Don't leave a truncated file behind for a later reader to pick up
+        await fs.unlink(outputPath).catch(() => undefined);
+      }
       logger.error('R2 download failed', {
         error: error instanceof Error ? error.message : String(error),
         key,
@@ -226,11 +225,11 @@ export class R2Service {
   }
 
   /**
-   * Get a file buffer from R2 (for proxying/serving)
+   * Get a readable stream for a file in R2 (for proxying without buffering the whole object)
    */
-  public async getFileBuffer(key: string): Promise<{ buffer: Buffer; contentType: string }> {
+  public async getFileStream(key: string): Promise<{ stream: Readable; contentType: string; contentLength: number | undefined }> {
     try {
-      logger.info('Getting file buffer from R2', { key });
+      logger.info('Getting file stream from R2', { key });
 
       const command = new GetObjectCommand({
         Bucket: this.bucketName,
@@ -243,31 +242,18 @@ export class R2Service {
         throw new Error('No body returned from R2');
       }
 
-      // Convert stream to buffer
-      const chunks: Uint8Array[] = [];
-      const stream = result.Body as Readable;
-      
-      for await (const chunk of stream) {
-        chunks.push(chunk);
-      }
-      
-      const buffer = Buffer.concat(chunks);
-      const contentType = result.ContentType || this.getContentTypeFromExtension(key);
-
-      logger.info('File buffer retrieved from R2', {
-        key,
-        size: buffer.length,
-        contentType,
-      });
-
-      return { buffer, contentType };
+      return {
+        stream: result.Body as Readable,
+        contentType: result.ContentType || this.getContentTypeFromExtension(key),
+        contentLength: result.ContentLength,
+      };
 
     } catch (error) {
-      logger.error('Failed to get file buffer from R2', {
+      logger.error('Failed to get file stream from R2', {
         error: error instanceof Error ? error.message : String(error),
         key,
       });
-      throw new Error(`Failed to get file buffer: ${error instanceof Error ? error.message : String(error)}`);
+      throw new Error(`Failed to get file stream: ${error instanceof Error ? error.message : String(error)}`);
     }
   }
 
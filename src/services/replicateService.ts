@@ -10,7 +10,21 @@ import { PromptingUtils } from '../utils/promptingUtils';
 import { InteriorDesignService } from './interiorDesignService';
 import { ElementReplacementService } from './elementReplacementService';
 import { ImageEnhancementService } from './imageEnhancementService';
-import { HybridStorageService } from './hybridStorageService';
+import { HybridStorageService, hybridStorageService } from './hybridStorageService';
+
+const MODEL_INFO_CACHE_TTL_MS = 10 * 60 * 1000; // 10 minutes
+
+// File extension for each image format a model may return, so stored keys match their bytes
+const IMAGE_EXTENSIONS_BY_CONTENT_TYPE: Record<string, string> = {
+  'image/png': '.png',
+  'image/jpeg': '.jpg',
+  'image/jpg': '.jpg',
+  'image/webp': '.webp',
+  'image/gif': '.gif',
+  'image/avif': '.avif',
+};
+// /health is polled every few seconds by load balancers and uptime checks
+const CONFIG_VALIDATION_CACHE_TTL_MS = 30 * 1000; // 30 seconds
 
 export class ReplicateService {
   private replicate: Replicate;
@@ -18,10 +32,14 @@ export class ReplicateService {
   private readonly qualityPresets: Record<string, QualityPreset>;
   private readonly storageService: HybridStorageService;
   
-  // Specialized services for each model type
-  private readonly interiorDesignService: InteriorDesignService;
-  private readonly elementReplacementService: ElementReplacementService;
-  private readonly imageEnhancementService: ImageEnhancementService;
+  // Specialized services for each model type, created on first use so that constructing
+  // ReplicateService does not spin up Replicate clients for models the caller never hits
+  private interiorDesignServiceInstance?: InteriorDesignService;
+  private elementReplacementServiceInstance?: ElementReplacementService;
+  private imageEnhancementServiceInstance?: ImageEnhancementService;
+
+  private modelInfoCache?: { value: Record<string, unknown>; expiresAt: number };
+  private configValidationCache?: { value: Promise<boolean>; expiresAt: number };
 
   constructor() {
     this.replicate = new Replicate({
@@ -29,12 +47,28 @@ export class ReplicateService {
     });
     this.defaultModel = config.stableDiffusionModel;
     this.qualityPresets = this.initializeQualityPresets();
-    this.storageService = new HybridStorageService();
-    
-    // Initialize specialized services
-    this.interiorDesignService = new InteriorDesignService();
-    this.elementReplacementService = new ElementReplacementService();
-    this.imageEnhancementService = new ImageEnhancementService();
+    this.storageService = hybridStorageService;
+  }
+
+  private get interiorDesignService(): InteriorDesignService {
+    if (!this.interiorDesignServiceInstance) {
+      this.interiorDesignServiceInstance = new InteriorDesignService();
+    }
+    return this.interiorDesignServiceInstance;
+  }
+
+  private get elementReplacementService(): ElementReplacementService {
+    if (!this.elementReplacementServiceInstance) {
+      this.elementReplacementServiceInstance = new ElementReplacementService();
+    }
+    return this.elementReplacementServiceInstance;
+  }
+
+  private get imageEnhancementService(): ImageEnhancementService {
+    if (!this.imageEnhancementServiceInstance) {
+      this.imageEnhancementServiceInstance = new ImageEnhancementService();
+    }
+    return this.imageEnhancementServiceInstance;
   }
 
   private initializeQualityPresets(): Record<string, QualityPreset> {
@@ -78,7 +112,7 @@ export class ReplicateService {
    * Generate ControlNet conditioning image for structure preservation
    */
   private async generateControlNetImage(
-    imagePath: string,
+    imagePath: string | Buffer,
     controlType: 'canny' | 'depth' | 'pose' | 'segmentation' = 'canny'
   ): Promise<string> {
     try {
@@ -149,7 +183,7 @@ export class ReplicateService {
    * Supports both single-pass and two-pass (depth + inpainting) workflows
    */
   public async processImage(
-    imagePath: string,
+    imagePath: string | Buffer,
     request: ProcessImageRequest = {}
   ): Promise<{ outputUrl: string; metadata: ProcessingMetadata }> {
     // For now, use single-pass workflow for all models
@@ -164,7 +198,7 @@ export class ReplicateService {
    * ⚠️ CRITICAL: Parameters are fixed and tested - DO NOT CHANGE
    */
   public async processImageWithInteriorDesign(
-    imagePath: string,
+    imagePath: string | Buffer,
     prompt: string,
     _options: {
       promptStrength?: number;
@@ -189,16 +223,17 @@ export class ReplicateService {
    * Single-pass workflow (original implementation)
    */
   private async processImageSinglePass(
-    imagePath: string,
+    imagePath: string | Buffer,
     request: ProcessImageRequest = {}
   ): Promise<{ outputUrl: string; metadata: ProcessingMetadata }> {
     const startTime = Date.now();
     const requestId = uuidv4();
+    const imageLabel = FileUtils.describeImageInput(imagePath);
     
     try {
       logger.info('🚀 Starting image processing', { 
         requestId, 
-        imagePath,
+        imagePath: imageLabel,
         model: this.defaultModel,
         isControlNetModel: this.isControlNetModel(),
         useControlNet: config.useControlNet,
@@ -206,28 +241,38 @@ export class ReplicateService {
         controlNetModel: config.controlNetModel
       });
 
-      // Validate image file exists
-      const fs = require('fs');
-      if (!fs.existsSync(imagePath)) {
-        throw new Error(`Image file not found: ${imagePath}`);
-      }
-      
-      const imageStats = fs.statSync(imagePath);
-      logger.info('📁 Image file details', {
-        requestId,
-        fileSize: imageStats.size,
-        fileExists: true,
-        imagePath
-      });
+      let fileExtension = '';
+      let isHeic = false;
+      if (Buffer.isBuffer(imagePath)) {
+        // In-memory input (already resized/converted by the controller) - nothing to stat
+        logger.info('📁 Image buffer details', {
+          requestId,
+          fileSize: imagePath.length,
+          isBuffer: true
+        });
+      } else {
+        // Validate image file exists
+        const imageStats = await FileUtils.statIfExists(imagePath);
+        if (!imageStats) {
+          throw new Error(`Image file not found: ${imagePath}`);
+        }
+        
+        logger.info('📁 Image file details', {
+          requestId,
+          fileSize: imageStats.size,
+          fileExists: true,
+          imagePath
+        });
 
-      // Check if file is HEIC and provide better error handling
-      const fileExtension = path.extname(imagePath).toLowerCase();
-      const isHeic = fileExtension === '.heic' || fileExtension === '.heif';
+        // Check if file is HEIC and provide better error handling
+        fileExtension = path.extname(imagePath).toLowerCase();
+        isHeic = fileExtension === '.heic' || fileExtension === '.heif';
+      }
       
       if (isHeic) {
         logger.warn('⚠️ HEIC file detected - this may cause processing issues', {
           requestId,
-          imagePath,
+          imagePath: imageLabel,
           fileExtension
         });
         
@@ -260,7 +305,7 @@ export class ReplicateService {
         logger.error('❌ Base64 conversion failed', {
           requestId,
           error: base64Error instanceof Error ? base64Error.message : String(base64Error),
-          imagePath,
+          imagePath: imageLabel,
           isHeic
         });
         
@@ -313,7 +358,11 @@ export class ReplicateService {
       logger.info('🌐 Making Replicate API call', { 
         requestId,
         model: this.defaultModel,
-        inputSize: JSON.stringify(replicateInput).length
+        // Sum the string fields instead of JSON.stringify-ing a multi-MB base64 payload just to log it
+        inputSize: Object.values(replicateInput).reduce<number>(
+          (size, value) => size + (typeof value === 'string' ? value.length : 0),
+          0
+        )
       });
       
       const output = await this.replicate.run(this.defaultModel as any, {
@@ -383,7 +432,7 @@ export class ReplicateService {
         errorStack: error instanceof Error ? error.stack : undefined,
         processingTime: endTime - startTime,
         model: this.defaultModel,
-        imagePath
+        imagePath: imageLabel
       });
       
       throw new Error(`Image processing failed: ${error instanceof Error ? error.message : String(error)}`);
@@ -453,14 +502,26 @@ export class ReplicateService {
       const buffer = await response.arrayBuffer();
       const nodeBuffer = Buffer.from(buffer);
       
+      // Store under the format the model actually returned (several models deliver JPEG/WebP),
+      // rather than labelling every output as PNG
+      const responseContentType = (response.headers.get('content-type') || '').split(';')[0].trim().toLowerCase();
+      const contentType = responseContentType.startsWith('image/') ? responseContentType : 'image/png';
+      
+      // Give the key the extension of the returned format: local storage is served by
+      // extension, and the download proxy derives the attachment filename from the key
+      const extension = IMAGE_EXTENSIONS_BY_CONTENT_TYPE[contentType];
+      const storageFilename = extension
+        ? `${path.parse(finalFilename).name}${extension}`
+        : finalFilename;
+      
       // Generate storage key
-      const storageKey = this.storageService.generateProcessedKey(finalFilename);
+      const storageKey = this.storageService.generateProcessedKey(storageFilename);
       
       // Upload to hybrid storage
       const storageResult = await this.storageService.uploadBuffer(
         nodeBuffer,
         storageKey,
-        'image/png',
+        contentType,
         {
           ...metadata,
           originalUrl: imageUrl,
@@ -696,15 +757,22 @@ export class ReplicateService {
    * Validate Replicate configuration
    */
   public async validateConfiguration(): Promise<boolean> {
-    try {
-      await this.replicate.models.list();
-      return true;
-    } catch (error) {
-      logger.error('Replicate configuration validation failed', { 
-        error: error instanceof Error ? error.message : String(error) 
-      });
-      return false;
+    // The in-flight promise is cached too, so concurrent health checks share one Replicate call
+    if (this.configValidationCache && this.configValidationCache.expiresAt > Date.now()) {
+      return this.configValidationCache.value;
     }
+
+    const value = this.replicate.models.list().then(
+      () => true,
+      (error: unknown) => {
+        logger.error('Replicate configuration validation failed', { 
+          error: error instanceof Error ? error.message : String(error) 
+        });
+        return false;
+      }
+    );
+    this.configValidationCache = { value, expiresAt: Date.now() + CONFIG_VALIDATION_CACHE_TTL_MS };
+    return value;
   }
 
   /**
@@ -753,15 +821,22 @@ export class ReplicateService {
    * Get model information
    */
   public async getModelInfo(): Promise<Record<string, unknown>> {
+    // Model metadata rarely changes, so serve it from memory instead of calling Replicate per request
+    if (this.modelInfoCache && this.modelInfoCache.expiresAt > Date.now()) {
+      return { ...this.modelInfoCache.value };
+    }
+
     try {
       const model = await this.replicate.models.get(this.defaultModel.split('/')[0], this.defaultModel.split('/')[1]);
-      return {
+      const modelInfo = {
         name: model.name,
         description: model.description,
         visibility: model.visibility,
         github_url: model.github_url,
         cover_image_url: model.cover_image_url,
       };
+      this.modelInfoCache = { value: modelInfo, expiresAt: Date.now() + MODEL_INFO_CACHE_TTL_MS };
+      return { ...modelInfo };
     } catch (error) {
       logger.error('Failed to get model info', { 
         error: error instanceof Error ? error.message : String(error),
@@ -1,6 +1,7 @@
 import Replicate from 'replicate';
 import { config } from '../config';
 import { logger } from '../utils/logger';
+import { FileUtils } from '../utils/fileUtils';
 import { v4 as uuidv4 } from 'uuid';
 
 export type EffectType = 
@@ -62,12 +63,11 @@ export class SmartEffectsService {
         });
       } else {
         // Input is a file path
-        const fs = require('fs');
-        if (!fs.existsSync(houseImagePath)) {
+        const houseImageStats = await FileUtils.statIfExists(houseImagePath);
+        if (!houseImageStats) {
           throw new Error(`House image file not found: ${houseImagePath}`);
         }
         
-        const houseImageStats = fs.statSync(houseImagePath);
         fileSize = houseImageStats.size;
         logger.info('📁 House image file details', {
           requestId,
@@ -77,7 +77,7 @@ export class SmartEffectsService {
         });
         
         // Read file into buffer
-        houseImageBuffer = fs.readFileSync(houseImagePath);
+        houseImageBuffer = await FileUtils.readFileAsBuffer(houseImagePath);
       }
 
       // Convert image to base64
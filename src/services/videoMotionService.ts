@@ -1,6 +1,7 @@
 import Replicate from 'replicate';
 import { config } from '../config';
 import { logger } from '../utils/logger';
+import { FileUtils } from '../utils/fileUtils';
 import { v4 as uuidv4 } from 'uuid';
 import sharp from 'sharp';
 
@@ -51,10 +52,41 @@ function getOrientedDimensions(width: number, height: number, orientation?: numb
   return { width, height };
 }
 
+/**
+ * Pick the Veo aspect ratio from already-decoded image metadata
+ * CRITICAL: Accounts for EXIF orientation to ensure correct aspect ratio detection
+ */
+function aspectRatioFromMetadata(metadata: sharp.Metadata): '16:9' | '9:16' {
+  if (!metadata.width || !metadata.height) {
+    logger.warn('Could not determine image dimensions, defaulting to 16:9');
+    return '16:9';
+  }
+
+  // Get correct dimensions accounting for EXIF orientation
+  // This is critical for smartphone photos which often have orientation metadata
+  const orientedDims = getOrientedDimensions(metadata.width, metadata.height, metadata.orientation);
+  const aspectRatio = calculateAspectRatio(orientedDims.width, orientedDims.height);
+  const imageRatio = orientedDims.width / orientedDims.height;
+
+  logger.info('📐 Calculated aspect ratio from image dimensions', {
+    rawWidth: metadata.width,
+    rawHeight: metadata.height,
+    orientedWidth: orientedDims.width,
+    orientedHeight: orientedDims.height,
+    exifOrientation: metadata.orientation,
+    imageRatio: imageRatio.toFixed(3),
+    aspectRatio,
+    isPortrait: orientedDims.height > orientedDims.width,
+    isLandscape: orientedDims.width > orientedDims.height,
+    isSquare: orientedDims.width === orientedDims.height
+  });
+
+  return aspectRatio;
+}
+
 /**
  * Get image dimensions from URL or buffer and calculate aspect ratio
  * Returns only '16:9' or '9:16' as those are the only values supported by Veo-3.1-Fast
- * CRITICAL: Accounts for EXIF orientation to ensure correct aspect ratio detection
  */
 async function getImageAspectRatio(imagePath: string | Buffer): Promise<'16:9' | '9:16'> {
   try {
@@ -76,31 +108,7 @@ async function getImageAspectRatio(imagePath: string | Buffer): Promise<'16:9' |
       metadata = await sharp(imagePath).metadata();
     }
     
-    if (!metadata.width || !metadata.height) {
-      logger.warn('Could not determine image dimensions, defaulting to 16:9');
-      return '16:9';
-    }
-    
-    // Get correct dimensions accounting for EXIF orientation
-    // This is critical for smartphone photos which often have orientation metadata
-    const orientedDims = getOrientedDimensions(metadata.width, metadata.height, metadata.orientation);
-    const aspectRatio = calculateAspectRatio(orientedDims.width, orientedDims.height);
-    const imageRatio = orientedDims.width / orientedDims.height;
-    
-    logger.info('📐 Calculated aspect ratio from image dimensions', {
-      rawWidth: metadata.width,
-      rawHeight: metadata.height,
-      orientedWidth: orientedDims.width,
-      orientedHeight: orientedDims.height,
-      exifOrientation: metadata.orientation,
-      imageRatio: imageRatio.toFixed(3),
-      aspectRatio,
-      isPortrait: orientedDims.height > orientedDims.width,
-      isLandscape: orientedDims.width > orientedDims.height,
-      isSquare: orientedDims.width === orientedDims.height
-    });
-    
-    return aspectRatio;
+    return aspectRatioFromMetadata(metadata);
   } catch (error) {
     logger.warn('Failed to detect image dimensions, defaulting to 16:9', {
       error: error instanceof Error ? error.message : String(error)
@@ -109,6 +117,20 @@ async function getImageAspectRatio(imagePath: string | Buffer): Promise<'16:9' |
   }
 }
 
+// Smart effect keywords, checked in priority order. Each effect's keywords are compiled into one
+// case-insensitive alternation so a prompt is scanned once per effect instead of once per keyword
+const EFFECT_TYPE_PATTERNS: Array<[string, RegExp]> = [
+  ['helicopter', /helicopter|drape|unveiling/i],
+  ['balloons', /balloon/i],
+  ['dusk', /dusk|evening|golden hour/i],
+  ['fireworks', /firework/i],
+  ['confetti', /confetti/i],
+  ['holiday_lights', /holiday|christmas|light/i],
+  ['snow', /snow|winter/i],
+  ['sunrise', /sunrise|morning light/i],
+  ['gift_bow', /gift|bow|ribbon/i]
+];
+
 export class VideoMotionService {
   private replicate: Replicate;
   private readonly veo3FastModelId = 'google/veo-3.1-fast:af87cbb0ee4dfffefb483e206251676fe21107fdec31aeb1f8855b55acea4fda';
@@ -159,11 +181,11 @@ export class VideoMotionService {
   }
 
   /**
-   * Download image from URL and convert to base64
+   * Download image from URL into memory
    */
-  private async downloadImageAsBase64(url: string, requestId: string): Promise<string> {
+  private async downloadImageBuffer(url: string, requestId: string): Promise<Buffer> {
     try {
-      logger.info('⬇️ Downloading image from URL for base64 conversion', { requestId, url });
+      logger.info('⬇️ Downloading image from URL', { requestId, url });
       
       const response = await fetch(url);
       if (!response.ok) {
@@ -172,17 +194,15 @@ export class VideoMotionService {
       
       const arrayBuffer = await response.arrayBuffer();
       const buffer = Buffer.from(arrayBuffer);
-      const base64 = buffer.toString('base64');
       
-      logger.info('✅ Image downloaded and converted to base64', { 
+      logger.info('✅ Image downloaded', { 
         requestId, 
-        originalSize: buffer.length,
-        base64Length: base64.length 
+        originalSize: buffer.length
       });
       
-      return `data:image/jpeg;base64,${base64}`;
+      return buffer;
     } catch (error) {
-      logger.error('❌ Failed to download image for base64 conversion', {
+      logger.error('❌ Failed to download image', {
         requestId,
         url,
         error: error instanceof Error ? error.message : String(error)
@@ -195,26 +215,9 @@ export class VideoMotionService {
    * Detect effect type from smart effects prompt by matching keywords
    */
   private detectEffectTypeFromPrompt(prompt: string): string | null {
-    const promptLower = prompt.toLowerCase();
-    
-    if (promptLower.includes('helicopter') || promptLower.includes('drape') || promptLower.includes('unveiling')) {
-      return 'helicopter';
-    } else if (promptLower.includes('balloon')) {
-      return 'balloons';
-    } else if (promptLower.includes('dusk') || promptLower.includes('evening') || promptLower.includes('golden hour')) {
-      return 'dusk';
-    } else if (promptLower.includes('firework')) {
-      return 'fireworks';
-    } else if (promptLower.includes('confetti')) {
-      return 'confetti';
-    } else if (promptLower.includes('holiday') || promptLower.includes('christmas') || promptLower.includes('light')) {
-      return 'holiday_lights';
-    } else if (promptLower.includes('snow') || promptLower.includes('winter')) {
-      return 'snow';
-    } else if (promptLower.includes('sunrise') || promptLower.includes('morning light')) {
-      return 'sunrise';
-    } else if (promptLower.includes('gift') || promptLower.includes('bow') || promptLower.includes('ribbon')) {
-      return 'gift_bow';
+    const match = EFFECT_TYPE_PATTERNS.find(([, pattern]) => pattern.test(prompt));
+    if (match) {
+      return match[0];
     }
     
     return null;
@@ -343,31 +346,22 @@ export class VideoMotionService {
         model: this.veo3FastModelId
       });
 
-      // Detect aspect ratio from image if not provided
-      // IMPORTANT: We need to detect BEFORE processing the image to ensure proper aspect ratio
-      let aspectRatio = options.aspectRatio;
-      if (!aspectRatio) {
-        aspectRatio = await getImageAspectRatio(imagePath);
-        logger.info('📐 Detected aspect ratio from image', { requestId, aspectRatio });
-      }
-
-      // Handle URL, buffer, and file path inputs
+      // Load the image into memory once: its metadata drives both aspect ratio detection and
+      // the resize below, and the resize works on the raw bytes rather than a base64 round trip
       let imageInput: string;
+      let sourceBuffer: Buffer | null = null;
       let imageMetadata: sharp.Metadata | null = null;
       
       if (typeof imagePath === 'string' && (imagePath.startsWith('http://') || imagePath.startsWith('https://'))) {
         // Check if it's a localhost URL - Replicate servers can't access localhost
         if (this.isLocalhostUrl(imagePath)) {
-          // Download and convert to base64 for localhost URLs
-          imageInput = await this.downloadImageAsBase64(imagePath, requestId);
+          // Download and send as base64 for localhost URLs
+          sourceBuffer = await this.downloadImageBuffer(imagePath, requestId);
+          imageInput = `data:image/jpeg;base64,${sourceBuffer.toString('base64')}`;
           logger.info('🔄 Converted localhost URL to base64', { requestId, originalUrl: imagePath });
           
-          // Get metadata for resizing
           try {
-            const response = await fetch(imagePath);
-            const arrayBuffer = await response.arrayBuffer();
-            const buffer = Buffer.from(arrayBuffer);
-            imageMetadata = await sharp(buffer).metadata();
+            imageMetadata = await sharp(sourceBuffer).metadata();
           } catch (err) {
             logger.warn('Could not get image metadata for resizing', { requestId });
           }
@@ -376,17 +370,10 @@ export class VideoMotionService {
           // This ensures the image matches the target aspect ratio before sending to Veo-3.1-Fast
           try {
             logger.info('⬇️ Downloading public URL for aspect ratio optimization', { requestId, url: imagePath });
-            const response = await fetch(imagePath);
-            if (!response.ok) {
-              throw new Error(`Failed to download image: ${response.status} ${response.statusText}`);
-            }
-            const arrayBuffer = await response.arrayBuffer();
-            const buffer = Buffer.from(arrayBuffer);
+            const buffer = await this.downloadImageBuffer(imagePath, requestId);
             imageMetadata = await sharp(buffer).metadata();
-            
-            // Convert to base64 so we can resize it
-            const imageBase64 = buffer.toString('base64');
-            imageInput = `data:image/jpeg;base64,${imageBase64}`;
+            sourceBuffer = buffer;
+            imageInput = `data:image/jpeg;base64,${buffer.toString('base64')}`;
             logger.info('📎 Downloaded and converted public URL to base64 for resizing', { 
               requestId, 
               originalUrl: imagePath,
@@ -399,37 +386,33 @@ export class VideoMotionService {
             });
             // Fallback to using URL directly if download fails
             imageInput = imagePath;
-            // Try to get metadata anyway for logging
-            try {
-              const response = await fetch(imagePath);
-              const arrayBuffer = await response.arrayBuffer();
-              const buffer = Buffer.from(arrayBuffer);
-              imageMetadata = await sharp(buffer).metadata();
-            } catch (metadataErr) {
-              // Ignore metadata error
-            }
           }
         }
       } else {
         // Handle buffer or file path - convert to base64 data URI
-        let imageBuffer: Buffer;
-        
         if (Buffer.isBuffer(imagePath)) {
-          imageBuffer = imagePath;
-          imageMetadata = await sharp(imageBuffer).metadata();
+          sourceBuffer = imagePath;
         } else {
-          const fs = require('fs');
-          if (!fs.existsSync(imagePath)) {
+          if (!(await FileUtils.statIfExists(imagePath))) {
             throw new Error(`Image file not found: ${imagePath}`);
           }
-          imageBuffer = fs.readFileSync(imagePath);
-          imageMetadata = await sharp(imageBuffer).metadata();
+          sourceBuffer = await FileUtils.readFileAsBuffer(imagePath);
         }
+        imageMetadata = await sharp(sourceBuffer).metadata();
 
         // Convert image to base64
         logger.info('🔄 Converting image to base64', { requestId });
-        const imageBase64 = imageBuffer.toString('base64');
-        imageInput = `data:image/jpeg;base64,${imageBase64}`;
+        imageInput = `data:image/jpeg;base64,${sourceBuffer.toString('base64')}`;
+      }
+
+      // Detect aspect ratio from image if not provided
+      // IMPORTANT: We need to detect BEFORE resizing the image to ensure proper aspect ratio
+      let aspectRatio = options.aspectRatio;
+      if (!aspectRatio) {
+        aspectRatio = imageMetadata
+          ? aspectRatioFromMetadata(imageMetadata)
+          : await getImageAspectRatio(imagePath);
+        logger.info('📐 Detected aspect ratio from image', { requestId, aspectRatio });
       }
       
       // Resize image to match target aspect ratio and ensure minimum 1080p quality
@@ -448,8 +431,8 @@ export class VideoMotionService {
           imageMetadata.height < targetHeight || 
           ratioDiff > 0.1; // More than 10% difference in aspect ratio
         
-        if (needsResize && typeof imageInput === 'string' && imageInput.startsWith('data:image')) {
-          // Only resize if we have a base64 image (buffer or converted)
+        if (needsResize && sourceBuffer) {
+          // Only resize if we have the image bytes (buffer, file or downloaded URL)
           try {
             logger.info('🔄 Resizing image to match target aspect ratio and resolution', {
               requestId,
@@ -460,32 +443,27 @@ export class VideoMotionService {
               targetRatio: targetRatio.toFixed(3)
             });
             
-            // Extract base64 data from data URI
-            const base64Data = imageInput.replace(/^data:image\/[a-z]+;base64,/, '');
-            const imageBuffer = Buffer.from(base64Data, 'base64');
-            
             // CRITICAL: Auto-orient image to apply EXIF orientation before resizing
             // This ensures the image is correctly oriented and respects the original photo structure
             // Resize to target dimensions with proper aspect ratio fit
             // Use 'cover' to fill the entire target size, or 'contain' to fit inside
-            const resizedBuffer = await sharp(imageBuffer)
+            // resolveWithObject reports the output size, so the result does not need decoding again
+            const { data: resizedBuffer, info: resizedInfo } = await sharp(sourceBuffer)
               .rotate() // Auto-apply EXIF orientation - this is critical for smartphone photos
               .resize(targetWidth, targetHeight, {
                 fit: 'cover', // Cover ensures full target size, may crop
                 position: 'center' // Center the crop
               })
               .jpeg({ quality: 95 }) // High quality JPEG
-              .toBuffer();
+              .toBuffer({ resolveWithObject: true });
             
             // Convert back to base64 data URI
             const resizedBase64 = resizedBuffer.toString('base64');
             imageInput = `data:image/jpeg;base64,${resizedBase64}`;
             
-            // Get new metadata
-            const newMetadata = await sharp(resizedBuffer).metadata();
             logger.info('✅ Image resized successfully', {
               requestId,
-              newDimensions: `${newMetadata.width}x${newMetadata.height}`,
+              newDimensions: `${resizedInfo.width}x${resizedInfo.height}`,
               newAspectRatio: aspectRatio
             });
           } catch (resizeError) {
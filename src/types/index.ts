@@ -55,8 +55,14 @@ export interface AppConfig {
   uploadDir: string;
   outputDir: string;
   tempDir: string;
+  processingMaxDimension: number;
+  processingJpegQuality: number;
   rateLimitWindowMs: number;
   rateLimitMaxRequests: number;
+  maxConcurrentGenerations: number;
+  maxQueuedGenerations: number;
+  batchEnhancementConcurrency: number;
+  sharpConcurrency: number;
   n8nWebhookUrl: string;
   // R2 Configuration
   r2AccountId: string;
@@ -1,10 +1,20 @@
 import sharp from 'sharp';
 import fs from 'fs/promises';
+import type { Stats } from 'fs';
 import path from 'path';
 import { v4 as uuidv4 } from 'uuid';
 import { FileUploadInfo } from '../types';
 import { logger } from './logger';
 
+// Encoder settings for HEIC/HEIF uploads re-encoded to WebP. effort stays at sharp's default
+// of 4; 6 is much slower for a marginal size gain.
+export const WEBP_OPTIONS: sharp.WebpOptions = {
+  quality: 95,
+  lossless: false,
+  effort: 4,
+  smartSubsample: true,
+};
+
 // Import heic-convert for better HEIC support
 let heicConvert: any;
 try {
@@ -37,16 +47,27 @@ export class FileUtils {
   }
 
   /**
-   * Convert image to base64 string
+   * Describe an image input for log metadata without dumping buffer contents
+   */
+  public static describeImageInput(input: string | Buffer | null): string | null {
+    return Buffer.isBuffer(input) ? `<buffer ${input.length} bytes>` : input;
+  }
+
+  /**
+   * Convert image (file path or already-loaded buffer) to a base64 data URL
    */
-  public static async imageToBase64(imagePath: string): Promise<string> {
+  public static async imageToBase64(image: string | Buffer): Promise<string> {
     try {
-      const imageBuffer = await fs.readFile(imagePath);
+      const imageBuffer = Buffer.isBuffer(image) ? image : await fs.readFile(image);
       const base64 = imageBuffer.toString('base64');
-      const mimeType = await this.getMimeType(imagePath);
+      // Sniff the format from the bytes already in memory instead of re-opening the file
+      const mimeType = await this.getMimeType(imageBuffer);
       return `data:${mimeType};base64,${base64}`;
     } catch (error) {
-      logger.error('Failed to convert image to base64', { error, imagePath });
+      logger.error('Failed to convert image to base64', {
+        error,
+        imagePath: FileUtils.describeImageInput(image)
+      });
       throw new Error(`Failed to convert image to base64: ${error}`);
     }
   }
@@ -74,11 +95,11 @@ export class FileUtils {
   }
 
   /**
-   * Get image mime type using sharp
+   * Get image mime type using sharp (from a file path or an already-loaded buffer)
    */
-  public static async getMimeType(imagePath: string): Promise<string> {
+  public static async getMimeType(image: string | Buffer): Promise<string> {
     try {
-      const metadata = await sharp(imagePath).metadata();
+      const metadata = await sharp(image).metadata();
       const format = metadata.format;
       
       const mimeTypes: Record<string, string> = {
@@ -95,49 +116,66 @@ export class FileUtils {
       
       return mimeTypes[format || 'jpeg'] || 'image/jpeg';
     } catch (error) {
-      logger.error('Failed to get mime type', { error, imagePath });
+      logger.error('Failed to get mime type', {
+        error,
+        imagePath: FileUtils.describeImageInput(image)
+      });
       return 'image/jpeg'; // Default fallback
     }
   }
 
   /**
-   * Validate image file
+   * Validate an image file and detect HEIC/HEIF input from a single metadata read.
    */
-  public static async validateImageFile(filePath: string): Promise<boolean> {
+  public static async inspectImageFile(filePath: string): Promise<{ isValidImage: boolean; isHeic: boolean }> {
+    const fileExtension = path.extname(filePath).toLowerCase();
+    const hasHeicExtension = fileExtension === '.heic' || fileExtension === '.heif';
+
     try {
       const metadata = await sharp(filePath).metadata();
-      return !!(metadata.width && metadata.height);
+      // Use type assertion since sharp supports heic/heif but TypeScript types don't include them
+      const format = metadata.format as string;
+      return {
+        isValidImage: !!(metadata.width && metadata.height),
+        isHeic: format === 'heic' || format === 'heif' || hasHeicExtension,
+      };
     } catch {
-      return false;
+      return { isValidImage: false, isHeic: hasHeicExtension };
     }
   }
 
   /**
-   * Resize image if needed
+   * Downscale an image to fit maxWidth x maxHeight and return the resulting bytes.
+   * Accepts a file path or an in-memory upload buffer. When jpegQuality is given,
+   * downscaled images are re-encoded as JPEG so the payload sent to the model stays
+   * small regardless of the upload format.
    */
-  public static async resizeImageIfNeeded(
-    inputPath: string,
-    outputPath: string,
+  public static async resizeImageToBuffer(
+    input: string | Buffer,
     maxWidth: number = 1024,
-    maxHeight: number = 1024
-  ): Promise<void> {
+    maxHeight: number = 1024,
+    jpegQuality?: number
+  ): Promise<Buffer> {
     try {
-      const image = sharp(inputPath);
+      const image = sharp(input);
       const metadata = await image.metadata();
       
       if (metadata.width! > maxWidth || metadata.height! > maxHeight) {
-        await image
-          .resize(maxWidth, maxHeight, { fit: 'inside', withoutEnlargement: true })
-          .toFile(outputPath);
+        const resized = image.resize(maxWidth, maxHeight, { fit: 'inside', withoutEnlargement: true });
+        const buffer = jpegQuality
+          // JPEG has no alpha channel, so flatten transparent PNG/WebP uploads onto white
+          ? await resized.flatten({ background: '#ffffff' }).jpeg({ quality: jpegQuality }).toBuffer()
+          : await resized.toBuffer();
         
         logger.info(`Resized image from ${metadata.width}x${metadata.height} to fit ${maxWidth}x${maxHeight}`);
-      } else {
-        // Copy original if no resize needed
-        await fs.copyFile(inputPath, outputPath);
-        logger.info('Image size is within limits, no resize needed');
+        return buffer;
       }
+
+      logger.info('Image size is within limits, no resize needed');
+      return Buffer.isBuffer(input) ? input : await fs.readFile(input);
     } catch (error) {
-      logger.error('Failed to resize image', { error, inputPath, outputPath });
+      const inputPath = FileUtils.describeImageInput(input);
+      logger.error('Failed to resize image', { error, inputPath });
       throw new Error(`Failed to resize image: ${error}`);
     }
   }
@@ -231,12 +269,7 @@ export class FileUtils {
       // Method 1: Try Sharp with WebP output
       try {
         await sharp(inputPath)
-          .webp({ 
-            quality: 95,           // Higher quality (90 → 95)
-            lossless: false,       // Better compression
-            effort: 6,            // Maximum compression effort (0-6)
-            smartSubsample: true   // Better color handling
-          })
+          .webp(WEBP_OPTIONS)
           .toFile(outputPath);
         
         logger.info(`Successfully converted HEIC/HEIF to WebP using Sharp: ${inputPath} -> ${outputPath}`);
@@ -256,12 +289,7 @@ export class FileUtils {
             .toFile(tempJpegPath);
           
           await sharp(tempJpegPath)
-            .webp({ 
-              quality: 95,           // Higher quality (90 → 95)
-              lossless: false,       // Better compression
-              effort: 6,            // Maximum compression effort (0-6)
-              smartSubsample: true   // Better color handling
-            })
+            .webp(WEBP_OPTIONS)
             .toFile(outputPath);
           
           // Clean up temp JPEG file
@@ -344,42 +372,6 @@ export class FileUtils {
     }
   }
 
-  /**
-   * Check if file is HEIC/HEIF format
-   */
-  public static async isHeicFormat(filePath: string): Promise<boolean> {
-    try {
-      // Method 1: Try to get metadata using Sharp
-      const metadata = await sharp(filePath).metadata();
-      // Use type assertion since sharp supports heic/heif but TypeScript types don't include them
-      const format = metadata.format as string;
-      if (format === 'heic' || format === 'heif') {
-        return true;
-      }
-      
-      // Method 2: Check file extension as fallback
-      const fileExtension = path.extname(filePath).toLowerCase();
-      if (fileExtension === '.heic' || fileExtension === '.heif') {
-        logger.debug('HEIC format detected by file extension', { filePath, format });
-        return true;
-      }
-      
-      return false;
-    } catch (error) {
-      // If Sharp fails, fall back to file extension check
-      try {
-        const fileExtension = path.extname(filePath).toLowerCase();
-        if (fileExtension === '.heic' || fileExtension === '.heif') {
-          logger.debug('HEIC format detected by file extension (Sharp failed)', { filePath, error });
-          return true;
-        }
-      } catch (extensionError) {
-        logger.debug('Failed to check file extension', { filePath, error, extensionError });
-      }
-      return false;
-    }
-  }
-
   /**
    * Get file info
    */
@@ -403,6 +395,20 @@ export class FileUtils {
     }
   }
 
+  /**
+   * Stat a file without blocking the event loop, returning null when it does not exist
+   */
+  public static async statIfExists(filePath: string): Promise<Stats | null> {
+    try {
+      return await fs.stat(filePath);
+    } catch (error) {
+      if ((error as NodeJS.ErrnoException).code === 'ENOENT') {
+        return null;
+      }
+      throw error;
+    }
+  }
+
   /**
    * Read file as buffer
    */
@@ -492,12 +498,7 @@ export class FileUtils {
       try {
         const sharp = require('sharp');
         const webpBuffer = await sharp(inputBuffer)
-          .webp({ 
-            quality: 95,           // Higher quality
-            lossless: false,       // Better compression
-            effort: 6,            // Maximum compression effort (0-6)
-            smartSubsample: true   // Better color handling
-          })
+          .webp(WEBP_OPTIONS)
           .toBuffer();
         
         logger.info('Successfully converted HEIC buffer to WebP using Sharp', { 
@@ -518,12 +519,7 @@ export class FileUtils {
             .toBuffer();
           
           const webpBuffer = await sharp(jpegBuffer)
-            .webp({ 
-              quality: 95,           // Higher quality
-              lossless: false,       // Better compression
-              effort: 6,            // Maximum compression effort (0-6)
-              smartSubsample: true   // Better color handling
-            })
+            .webp(WEBP_OPTIONS)
             .toBuffer();
           
           logger.info('Successfully converted HEIC buffer to WebP using JPEG fallback', { 
@@ -538,7 +534,6 @@ export class FileUtils {
           
           // Method 3: Try heic-convert plugin
           try {
-            const heicConvert = require('heic-convert');
             const jpegBuffer = await heicConvert({
               buffer: inputBuffer,
               format: 'JPEG',
@@ -547,12 +542,7 @@ export class FileUtils {
             
             const sharp = require('sharp');
             const webpBuffer = await sharp(jpegBuffer)
-              .webp({ 
-                quality: 95,           // Higher quality
-                lossless: false,       // Better compression
-                effort: 6,            // Maximum compression effort (0-6)
-                smartSubsample: true   // Better color handling
-              })
+              .webp(WEBP_OPTIONS)
               .toBuffer();
             
             logger.info('Successfully converted HEIC buffer to WebP using heic-convert', { 
@@ -9,18 +9,18 @@ export interface RoomAnalysis {
 }
 
 export class PromptingUtils {
-  private static getStylePrompts() {
-    return {
-      modern: process.env.PROMPT_STYLE_MODERN || 'clean lines, minimalist furniture, neutral colors, contemporary design',
-      contemporary: process.env.PROMPT_STYLE_CONTEMPORARY || 'sleek furniture, bold accents, modern art, sophisticated color palette',
-      traditional: process.env.PROMPT_STYLE_TRADITIONAL || 'classic furniture, warm wood tones, elegant fabrics, timeless design',
-      rustic: process.env.PROMPT_STYLE_RUSTIC || 'natural wood furniture, cozy textures, earth tones, farmhouse elements',
-      scandinavian: process.env.PROMPT_STYLE_SCANDINAVIAN || 'light wood, white and natural tones, cozy textiles, hygge atmosphere',
-      industrial: process.env.PROMPT_STYLE_INDUSTRIAL || 'exposed elements, metal fixtures, raw materials, urban loft aesthetic',
-      bohemian: process.env.PROMPT_STYLE_BOHEMIAN || 'eclectic mix, colorful textiles, plants, artistic elements',
-      luxury: process.env.PROMPT_STYLE_LUXURY || 'high-end furniture, rich materials, elegant details, sophisticated ambiance'
-    };
-  }
+  // Env-derived prompt tables are resolved once when the module loads (dotenv has already run
+  // via the config import) instead of being rebuilt on every prompt generation.
+  private static readonly STYLE_PROMPTS = {
+    modern: process.env.PROMPT_STYLE_MODERN || 'clean lines, minimalist furniture, neutral colors, contemporary design',
+    contemporary: process.env.PROMPT_STYLE_CONTEMPORARY || 'sleek furniture, bold accents, modern art, sophisticated color palette',
+    traditional: process.env.PROMPT_STYLE_TRADITIONAL || 'classic furniture, warm wood tones, elegant fabrics, timeless design',
+    rustic: process.env.PROMPT_STYLE_RUSTIC || 'natural wood furniture, cozy textures, earth tones, farmhouse elements',
+    scandinavian: process.env.PROMPT_STYLE_SCANDINAVIAN || 'light wood, white and natural tones, cozy textiles, hygge atmosphere',
+    industrial: process.env.PROMPT_STYLE_INDUSTRIAL || 'exposed elements, metal fixtures, raw materials, urban loft aesthetic',
+    bohemian: process.env.PROMPT_STYLE_BOHEMIAN || 'eclectic mix, colorful textiles, plants, artistic elements',
+    luxury: process.env.PROMPT_STYLE_LUXURY || 'high-end furniture, rich materials, elegant details, sophisticated ambiance'
+  };
 
   // New comprehensive interior design styles for real estate agents
   private static readonly INTERIOR_DESIGN_STYLES = {
@@ -102,24 +102,61 @@ export class PromptingUtils {
     }
   };
 
-  private static getRoomSpecificElements() {
-    const parseElements = (envVar: string | undefined, defaultElements: string[]): string[] => {
-      if (envVar) {
-        return envVar.split(',').map(e => e.trim());
-      }
-      return defaultElements;
-    };
-
-    return {
-      living_room: parseElements(process.env.PROMPT_ROOM_LIVING_ROOM_ELEMENTS, ['comfortable seating arrangement', 'coffee table', 'area rug', 'ambient lighting', 'decorative pillows', 'wall art', 'plants']),
-      bedroom: parseElements(process.env.PROMPT_ROOM_BEDROOM_ELEMENTS, ['bed with quality bedding', 'nightstands', 'table lamps', 'dresser', 'comfortable seating', 'window treatments', 'decorative accents']),
-      kitchen: parseElements(process.env.PROMPT_ROOM_KITCHEN_ELEMENTS, ['modern appliances', 'clean countertops', 'stylish backsplash', 'pendant lighting', 'bar stools', 'decorative bowls', 'fresh flowers']),
-      bathroom: parseElements(process.env.PROMPT_ROOM_BATHROOM_ELEMENTS, ['fresh towels', 'spa-like accessories', 'plants', 'candles', 'modern fixtures', 'clean lines', 'natural elements']),
-      dining_room: parseElements(process.env.PROMPT_ROOM_DINING_ROOM_ELEMENTS, ['dining table with chairs', 'centerpiece', 'pendant or chandelier lighting', 'sideboard', 'wall art', 'elegant place settings']),
-      office: parseElements(process.env.PROMPT_ROOM_OFFICE_ELEMENTS, ['desk setup', 'ergonomic chair', 'organized storage', 'task lighting', 'plants', 'motivational art', 'clean workspace'])
-    };
+  private static parseElements(envVar: string | undefined, defaultElements: string[]): string[] {
+    if (envVar) {
+      return envVar.split(',').map(e => e.trim());
+    }
+    return defaultElements;
   }
 
+  private static readonly ROOM_SPECIFIC_ELEMENTS = {
+    living_room: PromptingUtils.parseElements(process.env.PROMPT_ROOM_LIVING_ROOM_ELEMENTS, ['comfortable seating arrangement', 'coffee table', 'area rug', 'ambient lighting', 'decorative pillows', 'wall art', 'plants']),
+    bedroom: PromptingUtils.parseElements(process.env.PROMPT_ROOM_BEDROOM_ELEMENTS, ['bed with quality bedding', 'nightstands', 'table lamps', 'dresser', 'comfortable seating', 'window treatments', 'decorative accents']),
+    kitchen: PromptingUtils.parseElements(process.env.PROMPT_ROOM_KITCHEN_ELEMENTS, ['modern appliances', 'clean countertops', 'stylish backsplash', 'pendant lighting', 'bar stools', 'decorative bowls', 'fresh flowers']),
+    bathroom: PromptingUtils.parseElements(process.env.PROMPT_ROOM_BATHROOM_ELEMENTS, ['fresh towels', 'spa-like accessories', 'plants', 'candles', 'modern fixtures', 'clean lines', 'natural elements']),
+    dining_room: PromptingUtils.parseElements(process.env.PROMPT_ROOM_DINING_ROOM_ELEMENTS, ['dining table with chairs', 'centerpiece', 'pendant or chandelier lighting', 'sideboard', 'wall art', 'elegant place settings']),
+    office: PromptingUtils.parseElements(process.env.PROMPT_ROOM_OFFICE_ELEMENTS, ['desk setup', 'ergonomic chair', 'organized storage', 'task lighting', 'plants', 'motivational art', 'clean workspace'])
+  };
+
+  private static readonly QUALITY_PROMPTS = {
+    fast: {
+      prefix: process.env.PROMPT_QUALITY_FAST_PREFIX || 'clean and modern',
+      suffix: process.env.PROMPT_QUALITY_FAST_SUFFIX || 'well-lit, professional photo'
+    },
+    balanced: {
+      prefix: process.env.PROMPT_QUALITY_BALANCED_PREFIX || 'professionally staged and designed',
+      suffix: process.env.PROMPT_QUALITY_BALANCED_SUFFIX || 'perfect lighting, high-quality interior photography'
+    },
+    high: {
+      prefix: process.env.PROMPT_QUALITY_HIGH_PREFIX || 'expertly designed luxury interior',
+      suffix: process.env.PROMPT_QUALITY_HIGH_SUFFIX || 'studio quality lighting, architectural photography, magazine worthy'
+    },
+    ultra: {
+      prefix: process.env.PROMPT_QUALITY_ULTRA_PREFIX || 'award-winning interior design, luxury staging',
+      suffix: process.env.PROMPT_QUALITY_ULTRA_SUFFIX || 'professional architectural photography, perfect composition, museum quality, ultra-detailed'
+    }
+  };
+
+  private static readonly ENHANCEMENT_TERMS = PromptingUtils.parseElements(
+    process.env.PROMPT_ENHANCEMENTS,
+    ['professionally staged', 'architectural preservation', 'realistic proportions', 'perfect lighting', 'high-end interior photography']
+  );
+
+  // Lowercased once here so prompt matching only has to lowercase the incoming prompt
+  private static readonly ENHANCEMENT_TERMS_LOWER = PromptingUtils.ENHANCEMENT_TERMS.map(term => term.toLowerCase());
+
+  private static readonly NEGATIVE_BASE_TERMS = PromptingUtils.parseElements(
+    process.env.PROMPT_NEGATIVE_BASE,
+    ['blurry', 'low quality', 'distorted', 'unrealistic proportions', 'structural changes', 'architectural modifications', 'wall removal', 'ceiling changes', 'window modifications', 'door changes', 'cluttered', 'messy', 'oversaturated', 'artificial looking', 'poor lighting', 'dark', 'grainy', 'pixelated', 'furniture floating', 'impossible perspectives', 'duplicate objects']
+  );
+
+  // The default negative prompt is the same string on every request, so join it once
+  private static readonly NEGATIVE_BASE_PROMPT = PromptingUtils.NEGATIVE_BASE_TERMS.join(', ');
+
+  // Each base term paired with its lowercased form for de-duplicating against custom negatives
+  private static readonly NEGATIVE_BASE_ENTRIES: ReadonlyArray<readonly [string, string]> =
+    PromptingUtils.NEGATIVE_BASE_TERMS.map(term => [term, term.toLowerCase()] as const);
+
   /**
    * Generate an optimized prompt for interior design based on room analysis
    */
@@ -133,9 +170,9 @@ export class PromptingUtils {
         return this.enhanceCustomPrompt(customPrompt, style);
       }
 
-      const stylePrompts = this.getStylePrompts();
+      const stylePrompts = this.STYLE_PROMPTS;
       const styleDescription = stylePrompts[style as keyof typeof stylePrompts] || stylePrompts.modern;
-      const roomElementsMap = this.getRoomSpecificElements();
+      const roomElementsMap = this.ROOM_SPECIFIC_ELEMENTS;
       const roomElements = roomElementsMap[roomType as keyof typeof roomElementsMap] || roomElementsMap.living_room;
 
       const prompt = [
@@ -161,12 +198,11 @@ export class PromptingUtils {
    * Enhance a custom prompt with interior design best practices
    */
   static enhanceCustomPrompt(customPrompt: string, style: string): string {
-    const enhancementsStr = process.env.PROMPT_ENHANCEMENTS || 'professionally staged, architectural preservation, realistic proportions, perfect lighting, high-end interior photography';
-    const enhancements = enhancementsStr.split(',').map(e => e.trim());
-
     // Check if the prompt already contains professional terminology
-    const hasEnhancements = enhancements.some(enhancement => 
-      customPrompt.toLowerCase().includes(enhancement.toLowerCase())
+    // (lowercase the prompt once rather than once per enhancement term)
+    const lowerPrompt = customPrompt.toLowerCase();
+    const hasEnhancements = this.ENHANCEMENT_TERMS_LOWER.some(enhancement =>
+      lowerPrompt.includes(enhancement)
     );
 
     if (hasEnhancements) {
@@ -180,45 +216,24 @@ export class PromptingUtils {
    * Generate negative prompt to avoid common issues in interior design AI
    */
   static generateNegativePrompt(customNegative?: string): string {
-    const baseNegativesStr = process.env.PROMPT_NEGATIVE_BASE || 'blurry, low quality, distorted, unrealistic proportions, structural changes, architectural modifications, wall removal, ceiling changes, window modifications, door changes, cluttered, messy, oversaturated, artificial looking, poor lighting, dark, grainy, pixelated, furniture floating, impossible perspectives, duplicate objects';
-    const baseNegatives = baseNegativesStr.split(',').map(n => n.trim());
-
     if (customNegative) {
       // Combine custom negative with base negatives, avoiding duplicates
-      const customTerms = customNegative.split(',').map(term => term.trim().toLowerCase());
-      const additionalNegatives = baseNegatives.filter(negative => 
-        !customTerms.includes(negative.toLowerCase())
-      );
+      const customTerms = new Set(customNegative.split(',').map(term => term.trim().toLowerCase()));
+      const additionalNegatives = this.NEGATIVE_BASE_ENTRIES
+        .filter(([, lowerNegative]) => !customTerms.has(lowerNegative))
+        .map(([negative]) => negative);
       
       return [customNegative, ...additionalNegatives.slice(0, 5)].join(', ');
     }
 
-    return baseNegatives.join(', ');
+    return this.NEGATIVE_BASE_PROMPT;
   }
 
   /**
    * Generate prompts for different quality levels
    */
   static getQualityPrompt(quality: 'fast' | 'balanced' | 'high' | 'ultra'): { prefix: string; suffix: string } {
-    const qualityPrompts = {
-      fast: {
-        prefix: process.env.PROMPT_QUALITY_FAST_PREFIX || 'clean and modern',
-        suffix: process.env.PROMPT_QUALITY_FAST_SUFFIX || 'well-lit, professional photo'
-      },
-      balanced: {
-        prefix: process.env.PROMPT_QUALITY_BALANCED_PREFIX || 'professionally staged and designed',
-        suffix: process.env.PROMPT_QUALITY_BALANCED_SUFFIX || 'perfect lighting, high-quality interior photography'
-      },
-      high: {
-        prefix: process.env.PROMPT_QUALITY_HIGH_PREFIX || 'expertly designed luxury interior',
-        suffix: process.env.PROMPT_QUALITY_HIGH_SUFFIX || 'studio quality lighting, architectural photography, magazine worthy'
-      },
-      ultra: {
-        prefix: process.env.PROMPT_QUALITY_ULTRA_PREFIX || 'award-winning interior design, luxury staging',
-        suffix: process.env.PROMPT_QUALITY_ULTRA_SUFFIX || 'professional architectural photography, perfect composition, museum quality, ultra-detailed'
-      }
-    };
-
+    const qualityPrompts = this.QUALITY_PROMPTS;
     return qualityPrompts[quality] || qualityPrompts.balanced;
   }
 